@@ -0,0 +1,119 @@
+import json
+from types import MappingProxyType
+from typing import NamedTuple, Optional, Tuple
+class FoodEffect(NamedTuple):
+    name: str
+    hunger: float
+    happiness: float
+    message: str
+    health: float = 0
+    energy: float = 0
+    responses: Tuple[str, ...] = ("*eats happily*",)
+class ActivityEffect(NamedTuple):
+    name: str
+    happiness: float
+    energy: float
+    message: str
+    experience: float = 0
+    trait: Optional[str] = None
+    trait_change: float = 0
+    responses: Tuple[str, ...] = ("*plays happily*",)
+class ActionRegistry:
+    def __init__(self, default_food="kibble", default_activity="fetch"):
+        self.default_food = default_food
+        self.default_activity = default_activity
+        self._foods = {}
+        self._activities = {}
+        self.foods = MappingProxyType(self._foods)
+        self.activities = MappingProxyType(self._activities)
+    def register_food(self, name, hunger, happiness, message, health=0, energy=0, responses=None):
+        effect = FoodEffect(name, hunger, happiness, message, health, energy,
+                            tuple(responses) if responses else FoodEffect._field_defaults["responses"])
+        self._foods[name] = effect
+        return effect
+    def register_activity(self, name, happiness, energy, message, experience=0, trait=None, trait_change=0,
+                          responses=None):
+        effect = ActivityEffect(name, happiness, energy, message, experience, trait, trait_change,
+                                tuple(responses) if responses else ActivityEffect._field_defaults["responses"])
+        self._activities[name] = effect
+        return effect
+    def food(self, name):
+        return self._foods.get(name) or self._foods[self.default_food]
+    def activity(self, name):
+        return self._activities.get(name) or self._activities[self.default_activity]
+    def load_file(self, path):
+        with open(path, 'r') as f:
+            data = json.load(f)
+        for name, spec in data.get("foods", {}).items():
+            self.register_food(name, **spec)
+        for name, spec in data.get("activities", {}).items():
+            self.register_activity(name, **spec)
+def feeding_happiness(food, food_type, traits):
+    happiness = food.happiness
+    if food_type != "kibble" and traits.get("curiosity"):
+        happiness += (traits["curiosity"].strength / 100) * 5
+    return happiness
+def play_effect(activity, activity_name, traits, preferred_activity):
+    happiness = activity.happiness
+    experience = activity.experience
+    if traits.get("playfulness"):
+        happiness += (traits["playfulness"].strength / 100) * 5
+    if activity_name in ("puzzle", "training") and traits.get("intelligence"):
+        experience += (traits["intelligence"].strength / 100) * 3
+    if traits.get("independence"):
+        independence = traits["independence"].strength / 100
+        if activity_name == "cuddle":
+            happiness *= (1 - independence * 0.3)
+        elif activity_name in ("fetch", "puzzle"):
+            happiness *= (1 + independence * 0.2)
+    if activity_name == preferred_activity:
+        happiness *= 1.2
+    return happiness, experience
+ACTION_REGISTRY = ActionRegistry()
+ACTION_REGISTRY.register_food("kibble", -20, 5, "crunches steadily",
+                              responses=("*crunch crunch*", "*nom nom*", "*munch munch*"))
+ACTION_REGISTRY.register_food("treat", -10, 15, "devours excitedly",
+                              responses=("*excited wagging*", "*happy yips*", "*bounces with joy*"))
+ACTION_REGISTRY.register_food("vegetable", -15, 2, "nibbles carefully", health=5,
+                              responses=("*chews slowly*", "*sighs*", "*eats reluctantly*"))
+ACTION_REGISTRY.register_food("meat", -25, 10, "tears into hungrily", energy=5,
+                              responses=("*growls happily*", "*devours quickly*", "*licks lips*"))
+ACTION_REGISTRY.register_food("fish", -20, 12, "savors delicately", health=3,
+                              responses=("*purrs*", "*savors taste*", "*meows appreciation*"))
+ACTION_REGISTRY.register_activity("fetch", 15, -20, "bounds joyfully", trait="playfulness", trait_change=0.3,
+                                  responses=("*runs excitedly*", "*brings back toy*", "*pants happily*"))
+ACTION_REGISTRY.register_activity("tug", 12, -15, "tugs determinedly", trait="mischief", trait_change=0.2,
+                                  responses=("*growls playfully*", "*pulls hard*", "*shakes toy*"))
+ACTION_REGISTRY.register_activity("puzzle", 10, -10, "concentrates intently", experience=3,
+                                  trait="intelligence", trait_change=0.4,
+                                  responses=("*tilts head*", "*paws at puzzle*", "*looks proud*"))
+ACTION_REGISTRY.register_activity("cuddle", 20, -5, "snuggles warmly", trait="sociability", trait_change=0.4,
+                                  responses=("*purrs softly*", "*nuzzles close*", "*relaxes*"))
+ACTION_REGISTRY.register_activity("training", 8, -25, "focuses eagerly", experience=5,
+                                  trait="intelligence", trait_change=0.6,
+                                  responses=("*sits attentively*", "*performs trick*", "*wags tail*"))
+SITUATION_RESPONSES = MappingProxyType({
+    "too_full": MappingProxyType({
+        "high_mischief": ("Knocks over food bowl playfully", "Hides the food for later"),
+        "high_independence": ("Walks away with dignity", "Gives you a pointed look"),
+        "high_sociability": ("Nuzzles you apologetically", "Sits close but doesn't eat"),
+        "default": ("Pushes food away gently", "Looks satisfied")
+    }),
+    "too_tired": MappingProxyType({
+        "high_playfulness": ("Tries to play but stumbles sleepily", "Wags tail weakly"),
+        "high_independence": ("Curls up independently", "Finds a quiet spot to rest"),
+        "high_sociability": ("Leans against you tiredly", "Falls asleep near you"),
+        "default": ("Yawns and lies down", "Stretches and settles")
+    }),
+    "too_hungry": MappingProxyType({
+        "high_mischief": ("Steals attention from the activity", "Dramatically flops down"),
+        "high_intelligence": ("Points toward food bowl", "Brings you to food area"),
+        "high_sociability": ("Follows you around hopefully", "Makes pleading eyes"),
+        "default": ("Looks at empty food bowl", "Stomach rumbles audibly")
+    })
+})
+FAVORITE_RESPONSES = (
+    "Shows obvious delight - this is clearly a favorite!",
+    "Remembers how much they love this and gets extra excited",
+    "Reacts with learned enthusiasm from past experiences"
+)
@@ -0,0 +1,103 @@
+import json
+import sys
+from cli import build_game_manager
+from game_manager import GameConfig
+class BatchRunner:
+    def __init__(self, game_manager, output=None):
+        self.game_manager = game_manager
+        self.output = output or sys.stdout
+        self.commands = {
+            'new': self.create_pet,
+            'load': self.load_pet,
+            'switch': self.switch_pet,
+            'list': self.list_pets,
+            'pets': self.list_pets,
+            'feed': self.feed,
+            'play': self.play,
+            'rest': self.rest,
+            'status': self.status,
+            'mood': self.mood,
+            'personality': self.personality,
+            'traits': self.personality,
+            'insights': self.insights,
+            'evolution': self.evolution,
+            'save': self.save
+        }
+        self.pet_commands = {'feed', 'play', 'rest', 'status', 'mood', 'personality', 'traits', 'insights', 'evolution', 'save'}
+    def run(self, lines):
+        if self.game_manager.has_save_file():
+            self.game_manager.load_game()
+        failures = 0
+        for line_number, line in enumerate(lines, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            entry = self.execute(line)
+            entry["line"] = line_number
+            if not entry["ok"]:
+                failures += 1
+            self.output.write(json.dumps(entry, default=str) + "\n")
+        saved = self.finish()
+        return 0 if saved and not failures else 1
+    def execute(self, line):
+        parts = line.split()
+        command, args = parts[0].lower(), parts[1:]
+        handler = self.commands.get(command)
+        if handler is None:
+            return {"command": line, "ok": False, "error": f"Unknown command: '{command}'"}
+        pet = self.game_manager.pet
+        if command in self.pet_commands and not pet:
+            return {"command": line, "ok": False, "error": "No pet loaded"}
+        try:
+            if pet:
+                pet.update_passive_stats()
+                pet.level_up_check()
+            return {"command": line, "ok": True, "result": handler(args)}
+        except Exception as e:
+            return {"command": line, "ok": False, "error": str(e)}
+    def finish(self):
+        if self.game_manager.pet and self.game_manager.has_unsaved_changes():
+            return self.game_manager.save_game(durable=True)
+        return True
+    def create_pet(self, args):
+        if not args:
+            raise ValueError("Usage: new <name> [species]")
+        pet = self.game_manager.create_new_pet(args[0], args[1] if len(args) > 1 else "Generic")
+        return {"success": True, "pet_id": pet.pet_id, "name": pet.name, "species": pet.species}
+    def load_pet(self, args):
+        success = bool(self.game_manager.load_game(args[0] if args else None))
+        return {"success": success, "name": self.game_manager.pet.name if success else None}
+    def switch_pet(self, args):
+        success = self.game_manager.switch_pet(" ".join(args)) if args else False
+        return {"success": success, "name": self.game_manager.pet.name if success else None}
+    def list_pets(self, args):
+        return {"pets": self.game_manager.list_pets()}
+    def feed(self, args):
+        return self.game_manager.pet.feed(args[0]) if args else self.game_manager.pet.feed()
+    def play(self, args):
+        return self.game_manager.pet.play(args[0]) if args else self.game_manager.pet.play()
+    def rest(self, args):
+        return self.game_manager.pet.rest()
+    def status(self, args):
+        return self.game_manager.pet.get_status()
+    def mood(self, args):
+        return {"mood": self.game_manager.pet.calculate_mood()}
+    def personality(self, args):
+        return {
+            name: {"strength": trait.strength, "level": trait.get_level()}
+            for name, trait in self.game_manager.pet.personality_traits.items()
+        }
+    def insights(self, args):
+        pet = self.game_manager.pet
+        return {"insights": pet.get_behavioral_insights(), "average_impact": pet.memory.average_impact_by_type()}
+    def evolution(self, args):
+        pet = self.game_manager.pet
+        return {"evolution_stage": pet.evolution_stage, "evolution_points": pet.evolution_points, "level": pet.level}
+    def save(self, args):
+        return {"success": self.game_manager.save_game()}
+def run_batch(source="-", output=None, config=None):
+    game_manager = build_game_manager(config or GameConfig())
+    if source == "-":
+        return BatchRunner(game_manager, output).run(sys.stdin)
+    with open(source, 'r') as f:
+        return BatchRunner(game_manager, output).run(f)
@@ -0,0 +1,40 @@
+import gc
+import os
+import random
+import sys
+import tracemalloc
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pet import Pet
+FOODS = ["kibble", "treat", "vegetable", "meat", "fish"]
+ACTIVITIES = ["fetch", "tug", "puzzle", "cuddle", "training"]
+def build_pets(count, interactions):
+    rng = random.Random(1234)
+    pets = []
+    for index in range(count):
+        pet = Pet(f"pet{index}", "Benchmark")
+        for _ in range(interactions):
+            pet.hunger, pet.energy = 50, 60
+            if rng.random() < 0.5:
+                pet.feed(rng.choice(FOODS))
+            else:
+                pet.play(rng.choice(ACTIVITIES))
+        pets.append(pet)
+    return pets
+def measure(count=200, interactions=500):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    pets = build_pets(count, interactions)
+    gc.collect()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    total = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del pets
+    return total / count
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    interactions = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    bytes_per_pet = measure(count, interactions)
+    print(f"{count} pets x {interactions} interactions: {bytes_per_pet:,.0f} bytes per pet")
+if __name__ == "__main__":
+    main()
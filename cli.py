@@ -3,13 +3,34 @@ import sys
 import time
 from datetime import datetime
 from typing import Dict, List, Optional
+from actions import ACTION_REGISTRY
 from pet import Pet
 from game_manager import GameManager, GameStats, GameConfig
+from pet_store import PetStore
+from profiler import CommandProfiler
+PROFILE_ENV_VAR = "TERMINAL_PETS_PROFILE"
+def build_game_manager(game_config):
+    actions_file = game_config.get_setting("actions_file")
+    if actions_file and os.path.exists(actions_file):
+        ACTION_REGISTRY.load_file(actions_file)
+    store_file = game_config.get_setting("pet_store")
+    store = None
+    if store_file:
+        synchronous = "FULL" if game_config.get_setting("fsync_policy") == "always" else "NORMAL"
+        store = PetStore(store_file, synchronous=synchronous)
+    return GameManager(config=game_config, store=store)
 class TerminalPetsCLI:
     def __init__(self):
-        self.game_manager = GameManager()
-        self.game_stats = GameStats()
         self.game_config = GameConfig()
+        self.game_manager = build_game_manager(self.game_config)
+        self.game_stats = GameStats(
+            write_behind=self.game_config.get_setting("stats_write_behind", False),
+            flush_every=self.game_config.get_setting("stats_flush_every", 20),
+            flush_interval_seconds=self.game_config.get_setting("stats_flush_interval_seconds", 10)
+        )
+        self.profiler = CommandProfiler(
+            enabled=bool(self.game_config.get_setting("debug_mode", False) or os.environ.get(PROFILE_ENV_VAR))
+        )
         self.running = True
         self.commands = {
             'help': self.show_help,
@@ -35,10 +56,14 @@ class TerminalPetsCLI:
             'insights': self.show_behavioral_insights,
             'patterns': self.show_behavioral_patterns,
             'environment': self.show_environment_info,
-            'preferences': self.show_preferences
+            'preferences': self.show_preferences,
+            'list': self.list_pets,
+            'pets': self.list_pets,
+            'switch': self.switch_pet,
+            'perf': self.show_performance
         }
-        self.food_types = ["kibble", "treat", "vegetable", "meat", "fish"]
-        self.activity_types = ["fetch", "tug", "puzzle", "cuddle", "training"]
+        self.food_types = list(ACTION_REGISTRY.foods)
+        self.activity_types = list(ACTION_REGISTRY.activities)
     def start(self):
         self.clear_screen()
         self.show_banner()
@@ -46,7 +71,11 @@ class TerminalPetsCLI:
             self.handle_existing_save()
         else:
             self.setup_new_game()
-        self.main_loop()
+        try:
+            self.main_loop()
+        finally:
+            if self.profiler.enabled:
+                self.profiler.dump(self.game_config.get_setting("profile_file", "cli_profile.json"))
     def show_banner(self):
         print("=" * 70)
         print("                          TERMINAL PETS")
@@ -116,11 +145,16 @@ class TerminalPetsCLI:
         while self.running:
             try:
                 if self.game_manager.pet:
-                    self.game_manager.pet.update_passive_stats()
-                    if self.game_manager.pet.level_up_check():
+                    with self.profiler.measure("passive_update"):
+                        self.game_manager.pet.update_passive_stats()
+                        leveled_up = self.game_manager.pet.level_up_check()
+                    if leveled_up:
                         print(f"\nLevel up! {self.game_manager.pet.name} is now level {self.game_manager.pet.level}!")
                     if self.game_config.get_setting("auto_save", True):
-                        self.game_manager.auto_save()
+                        with self.profiler.measure("auto_save"):
+                            self.game_manager.auto_save()
+                for error in self.game_manager.take_save_errors():
+                    print(f"Background save failed: {error}")
                 user_input = input("> ").strip().lower()
                 if not user_input:
                     continue
@@ -128,15 +162,19 @@ class TerminalPetsCLI:
                 command = parts[0]
                 args = parts[1:] if len(parts) > 1 else []
                 if command in self.commands:
-                    self.commands[command](args)
-                    self.game_stats.update_interaction()
+                    with self.profiler.measure(f"command.{command}"):
+                        self.commands[command](args)
+                    with self.profiler.measure("stats_save"):
+                        self.game_stats.update_interaction()
                 else:
                     print(f"Unknown command: '{command}'. Type 'help' for available commands.")
             except KeyboardInterrupt:
                 print("\nSaving game...")
-                self.save_game([])
+                self.save_game([], durable=True)
                 self.running = False
             except EOFError:
+                if self.game_manager.has_unsaved_changes():
+                    self.game_manager.save_game(durable=True)
                 self.running = False
             except Exception as e:
                 print(f"Error: {e}")
@@ -144,8 +182,8 @@ class TerminalPetsCLI:
         print("\nAvailable Commands:")
         print("-" * 40)
         print("Pet Care:")
-        print("  feed [type]    - Feed pet (kibble/treat/vegetable/meat/fish)")
-        print("  play [type]    - Play (fetch/tug/puzzle/cuddle/training)")
+        print(f"  feed [type]    - Feed pet ({'/'.join(self.food_types)})")
+        print(f"  play [type]    - Play ({'/'.join(self.activity_types)})")
         print("  rest           - Let pet rest")
         print("\nInformation:")
         print("  status         - Show pet status")
@@ -164,6 +202,9 @@ class TerminalPetsCLI:
         print("  save           - Save game")
         print("  new            - Create new pet")
         print("  load           - Load saved pet")
+        print("  list           - List saved pets")
+        print("  switch <name>  - Switch to another saved pet")
+        print("  perf           - Show command latency (debug mode)")
         print("  clear          - Clear screen")
         print("  quit           - Save and exit")
     def show_status(self, args):
@@ -244,13 +285,13 @@ class TerminalPetsCLI:
         print(f"Age: {pet.get_age()}")
         print(f"Level: {pet.level}")
         print(f"Total interactions: {pet.total_interactions}")
-    def save_game(self, args):
-        if self.game_manager.save_game():
+    def save_game(self, args, durable=False):
+        if self.game_manager.save_game(durable=durable, wait=True):
             print("Game saved.")
         else:
             print("Save failed.")
     def create_new_pet(self, args):
-        if self.game_manager.has_save_file():
+        if self.game_manager.store is None and self.game_manager.has_save_file():
             confirm = input("This will delete current pet. Continue? (y/n): ")
             if confirm.lower() not in ['y', 'yes']:
                 print("Cancelled.")
@@ -262,13 +303,52 @@ class TerminalPetsCLI:
             print(f"Loaded {self.game_manager.pet.name}")
         else:
             print("Load failed.")
+    def list_pets(self, args):
+        pets = self.game_manager.list_pets()
+        if not pets:
+            print("No saved pets.")
+            return
+        current_id = self.game_manager.pet.pet_id if self.game_manager.pet else None
+        print(f"\nSaved pets ({len(pets)}):")
+        print("-" * 40)
+        for info in pets:
+            marker = "*" if info.get("pet_id") == current_id else " "
+            pet_id = (info.get("pet_id") or "")[:8]
+            print(f" {marker} {info['name']:20} {info['species']:10} Level {info['level']:<3} {pet_id}")
+    def switch_pet(self, args):
+        if self.game_manager.store is None:
+            print("Switching pets requires a pet store (set 'pet_store' in the game config).")
+            return
+        if not args:
+            print("Usage: switch <name or id>")
+            return
+        if self.game_manager.switch_pet(" ".join(args)):
+            print(f"Switched to {self.game_manager.pet.name}.")
+            self.show_pet_status_brief()
+        else:
+            print(f"No saved pet matches '{' '.join(args)}'.")
+    def show_performance(self, args):
+        if not self.profiler.enabled:
+            print(f"Profiling is off. Enable 'debug_mode' in the game config or set {PROFILE_ENV_VAR}=1.")
+            return
+        summary = self.profiler.summary()
+        if not summary:
+            print("No timings recorded yet.")
+            return
+        print(f"\nCommand latency (last {self.profiler.window} samples per phase, ms):")
+        print("-" * 70)
+        print(f"  {'phase':22} {'count':>6} {'mean':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+        for phase, timing in summary.items():
+            print(f"  {phase:22} {timing['count']:6d} {timing['mean_ms']:8.2f} {timing['p50_ms']:8.2f} "
+                  f"{timing['p95_ms']:8.2f} {timing['p99_ms']:8.2f} {timing['max_ms']:8.2f}")
     def clear_screen(self, args=None):
         os.system('clear' if os.name == 'posix' else 'cls')
     def quit_game(self, args):
         print("\nThanks for playing!")
         if self.game_manager.pet:
-            self.save_game([])
+            self.save_game([], durable=True)
             print(f"{self.game_manager.pet.name} will miss you!")
+        self.game_stats.flush()
         self.running = False
     def show_personality(self, args):
         if not self.game_manager.pet:
@@ -378,6 +458,10 @@ class TerminalPetsCLI:
             for food, data in pet.preferred_foods.items():
                 avg_satisfaction = data["satisfaction_total"] / max(1, data["times_eaten"])
                 print(f"  {food}: {avg_satisfaction:.1f}/20 satisfaction (eaten {data['times_eaten']} times)")
+        if hasattr(pet, 'memory') and pet.memory.experiences:
+            print("\nAverage emotional impact (recent memories):")
+            for exp_type, impact in sorted(pet.memory.average_impact_by_type().items()):
+                print(f"  {exp_type}: {impact:+.2f}")
     def show_behavioral_patterns(self, args):
         if not self.game_manager.pet:
             print("No pet found.")
@@ -408,18 +492,16 @@ class TerminalPetsCLI:
             return
         pet = self.game_manager.pet
         from pet import EnvironmentSensor
-        time_mod = EnvironmentSensor.get_time_of_day_modifier()
-        seasonal_mod = EnvironmentSensor.get_seasonal_modifier()
+        environment = EnvironmentSensor.snapshot()
+        time_mod = environment.time_modifier
+        seasonal_mod = environment.seasonal_modifier
         print(f"\nEnvironmental Status:")
         print("=" * 40)
-        hour = datetime.now().hour
-        print(f"Current time: {hour}:00")
+        print(f"Current time: {environment.hour}:00")
         print(f"Preferred activity: {time_mod.get('activity_preference', 'any')}")
         print(f"Energy modifier: {time_mod.get('energy', 1.0):.1f}x")
         print(f"Happiness modifier: {time_mod.get('happiness', 1.0):.1f}x")
-        month = datetime.now().month
-        season = EnvironmentSensor._get_season(month)
-        print(f"\nCurrent season: {season}")
+        print(f"\nCurrent season: {environment.season}")
         print(f"Health modifier: {seasonal_mod.get('health', 1.0):.1f}x")
         print(f"Energy modifier: {seasonal_mod.get('energy', 1.0):.1f}x")
         print(f"Happiness modifier: {seasonal_mod.get('happiness', 1.0):.1f}x")
@@ -436,27 +518,17 @@ class TerminalPetsCLI:
         print("=" * 40)
         if hasattr(pet, 'preferred_foods') and pet.preferred_foods:
             print("Food preferences (by satisfaction):")
-            food_items = [(food, data["satisfaction_total"] / max(1, data["times_eaten"])) 
-                         for food, data in pet.preferred_foods.items()]
-            food_items.sort(key=lambda x: x[1], reverse=True)
-            for food, avg_satisfaction in food_items:
+            for food, avg_satisfaction in pet.food_preference_ranking():
                 preference = "loves" if avg_satisfaction > 15 else "likes" if avg_satisfaction > 10 else "tolerates"
                 print(f"  {food}: {preference} ({avg_satisfaction:.1f}/20)")
         if hasattr(pet, 'favorite_activities') and pet.favorite_activities:
             print("\nActivity preferences (by enjoyment):")
-            activity_items = [(activity, data["enjoyment_total"] / max(1, data["times_played"])) 
-                            for activity, data in pet.favorite_activities.items()]
-            activity_items.sort(key=lambda x: x[1], reverse=True)
-            for activity, avg_enjoyment in activity_items:
+            for activity, avg_enjoyment in pet.activity_preference_ranking():
                 preference = "adores" if avg_enjoyment > 15 else "enjoys" if avg_enjoyment > 10 else "accepts"
                 print(f"  {activity}: {preference} ({avg_enjoyment:.1f}/20)")
         if hasattr(pet, 'memory') and pet.memory.time_patterns:
             print("\nTime preferences:")
-            best_times = {}
-            for hour, activities in pet.memory.time_patterns.items():
-                total = sum(activities.values())
-                if total > 5:  
-                    best_times[hour] = total
+            best_times = {hour: total for hour, total in pet.memory.hour_totals.items() if total > 5}
             if best_times:
                 sorted_times = sorted(best_times.items(), key=lambda x: x[1], reverse=True)
                 for hour, count in sorted_times[:3]:  
@@ -0,0 +1,77 @@
+import argparse
+import asyncio
+import json
+import sys
+from server import DEFAULT_ADDRESS, parse_address
+class PetClient:
+    def __init__(self, address=DEFAULT_ADDRESS):
+        self.address = parse_address(address) if isinstance(address, str) else address
+        self.reader = None
+        self.writer = None
+    async def connect(self):
+        if isinstance(self.address, tuple):
+            self.reader, self.writer = await asyncio.open_connection(*self.address)
+        else:
+            self.reader, self.writer = await asyncio.open_unix_connection(self.address)
+        return self
+    async def send(self, line):
+        self.writer.write((line.strip() + "\n").encode())
+        await self.writer.drain()
+        response = await self.reader.readline()
+        if not response:
+            raise ConnectionError("Server closed the connection")
+        return json.loads(response)
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except ConnectionError:
+                pass
+            self.writer = None
+    async def __aenter__(self):
+        return await self.connect()
+    async def __aexit__(self, *exc_info):
+        await self.close()
+def format_entry(entry):
+    if not entry["ok"]:
+        return f"Error: {entry['error']}"
+    result = entry["result"]
+    if isinstance(result, dict) and "message" in result:
+        return result["message"]
+    return json.dumps(result, indent=2, default=str)
+async def run_client(address, source=None, output=None):
+    source = source or sys.stdin
+    output = output or sys.stdout
+    loop = asyncio.get_running_loop()
+    failures = 0
+    async with PetClient(address) as client:
+        while True:
+            line = await loop.run_in_executor(None, source.readline)
+            if not line:
+                break
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            entry = await client.send(line)
+            if not entry["ok"]:
+                failures += 1
+            output.write(format_entry(entry) + "\n")
+            output.flush()
+            if line.lower() in ("quit", "exit"):
+                break
+    return 0 if not failures else 1
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Terminal Pets client")
+    parser.add_argument("address", nargs="?", default=DEFAULT_ADDRESS,
+                        help="host:port of the server, or the path of its Unix domain socket")
+    args = parser.parse_args(argv)
+    try:
+        return asyncio.run(run_client(args.address))
+    except (ConnectionError, OSError) as e:
+        print(f"Connection failed: {e}")
+        return 1
+    except KeyboardInterrupt:
+        return 0
+if __name__ == "__main__":
+    sys.exit(main())
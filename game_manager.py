@@ -1,72 +1,417 @@
+import atexit
 import json
 import os
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime
 from typing import Optional
-from pet import Pet
+from pet import Pet, format_timestamp, parse_timestamp
+from serializers import detect_serializer, get_serializer
+from migrations import migrate_document, needs_migration
+FSYNC_POLICIES = ("never", "on_quit", "always")
+def atomic_write_file(path, data, fsync=False):
+    temp_path = f"{path}.tmp"
+    mode = 'wb' if isinstance(data, bytes) else 'w'
+    try:
+        with open(temp_path, mode) as f:
+            f.write(data)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    if fsync and os.name == 'posix':
+        dir_fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+class SaveWriter:
+    def __init__(self, max_pending=4):
+        self.max_pending = max(1, max_pending)
+        self._pending = OrderedDict()
+        self._in_flight = 0
+        self._errors = []
+        self._closed = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="save-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+    def submit(self, path, payload, fsync=False):
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Save writer is closed")
+            if path in self._pending:
+                fsync = fsync or self._pending[path][1]
+            else:
+                self._condition.wait_for(lambda: len(self._pending) < self.max_pending)
+            self._pending[path] = (payload, fsync)
+            self._condition.notify_all()
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending or self._closed)
+                if not self._pending:
+                    return
+                path, (payload, fsync) = self._pending.popitem(last=False)
+                self._in_flight += 1
+                self._condition.notify_all()
+            try:
+                atomic_write_file(path, payload, fsync=fsync)
+            except Exception as e:
+                with self._condition:
+                    self._errors.append(f"{path}: {e}")
+            finally:
+                with self._condition:
+                    self._in_flight -= 1
+                    self._condition.notify_all()
+    def flush(self, timeout=None):
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._pending and not self._in_flight, timeout)
+    def take_errors(self):
+        with self._condition:
+            errors, self._errors = self._errors, []
+        return errors
+    def close(self):
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join()
 class GameManager:
-    def __init__(self, save_file="pet_save.json"):
+    def __init__(self, save_file="pet_save.json", config=None, store=None):
         self.save_file = save_file
+        self.journal_file = f"{save_file}.journal"
+        self.config = config
+        self.store = store
         self.pet = None
         self.game_active = False
+        self._saved_version = None
+        self._last_save_time = 0.0
+        self._journal_seq = 0
+        self._journal_lines = 0
+        self._document_cache = None
+        self.serializer = get_serializer(self._setting("save_format", "json"))
+        self.writer = None
+        self.save_errors = []
+    def _setting(self, key, default=None):
+        if self.config is None:
+            return default
+        return self.config.get_setting(key, default)
+    def _journal_enabled(self):
+        return self.store is None and self._setting("journal_mode", False)
+    def _save_writer(self):
+        if self.store is not None or self._journal_enabled() or not self._setting("async_save", False):
+            return None
+        if self.writer is None:
+            self.writer = SaveWriter(self._setting("async_save_max_pending", 4))
+        return self.writer
     def create_new_pet(self, name, species="Generic"):
-        self.pet = Pet(name, species)
+        if self.store is not None and self.pet and self.has_unsaved_changes():
+            self.save_game()
+        self.pet = Pet(
+            name, species,
+            memory_capacity=self._setting("memory_capacity", 100),
+            columnar_memory=self._setting("columnar_memory", False)
+        )
         self.game_active = True
         self.save_game()
+        if self._journal_enabled():
+            self.pet.enable_journal()
         return self.pet
-    def load_game(self):
+    def load_game(self, pet_id=None):
+        if self.store is not None:
+            return self._load_from_store(pet_id)
         if not os.path.exists(self.save_file):
             return False
         try:
-            with open(self.save_file, 'r') as f:
-                data = json.load(f)
+            data = self._read_document()
+            upgraded = self._document_cache[2]
+            self._document_cache = None
             self.pet = Pet.from_dict(data)
+            torn_tail = self._replay_journal(data.get("journal_seq", 0))
             self.game_active = True
+            self._mark_saved()
+            if self._journal_enabled():
+                self.pet.enable_journal()
+            if upgraded or torn_tail or (self._journal_lines and not self._journal_enabled()):
+                self.compact_journal()
             self.pet.update_passive_stats()
             return True
+        except (KeyError, ValueError, EOFError, TypeError):
+            return False
+    def _read_document(self):
+        self._settle_writes()
+        stat = os.stat(self.save_file)
+        key = (stat.st_mtime_ns, stat.st_size)
+        if self._document_cache is not None and self._document_cache[0] == key:
+            return self._document_cache[1]
+        with open(self.save_file, 'rb') as f:
+            raw = f.read()
+        serializer = detect_serializer(raw[:16])
+        if serializer is None:
+            raise ValueError(f"Unrecognized save format in {self.save_file}")
+        data = serializer.loads(raw)
+        upgraded = needs_migration(data)
+        data = migrate_document(data)
+        self._document_cache = (key, data, upgraded)
+        return data
+    def _read_save_header(self):
+        self._settle_writes()
+        with open(self.save_file, 'rb') as f:
+            serializer = detect_serializer(f.read(16))
+            if serializer is None:
+                return None
+            f.seek(0)
+            return serializer.read_header(f)
+    def _read_journal_tail(self):
+        if not os.path.exists(self.journal_file):
+            return None
+        with open(self.journal_file, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            f.seek(max(0, size - 65536))
+            lines = f.read().split(b"\n")
+        for line in reversed(lines[:-1]):
+            try:
+                return json.loads(line)
+            except ValueError:
+                continue
+        return None
+    def _load_from_store(self, pet_id=None):
+        if pet_id is None:
+            pet_id = self.pet.pet_id if self.pet else self.store.most_recent_pet_id()
+        if pet_id is None:
+            return False
+        try:
+            pet = self.store.load_pet(pet_id)
         except (json.JSONDecodeError, KeyError, ValueError):
             return False
-    def save_game(self):
+        if pet is None:
+            return False
+        self.pet = pet
+        self.game_active = True
+        self._mark_saved()
+        self.pet.update_passive_stats()
+        return True
+    def list_pets(self):
+        if self.store is not None:
+            return self.store.list_pets()
+        save_info = self.get_save_info()
+        return [save_info] if save_info else []
+    def switch_pet(self, name_or_id):
+        if self.store is None:
+            return False
+        pet_id = self.store.find_pet_id(name_or_id)
+        if pet_id is None:
+            return False
+        if self.pet and self.has_unsaved_changes():
+            self.save_game()
+        return self._load_from_store(pet_id)
+    def _replay_journal(self, snapshot_seq):
+        self._journal_seq = snapshot_seq
+        self._journal_lines = 0
+        if not os.path.exists(self.journal_file):
+            return False
+        with open(self.journal_file, 'r') as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    return True
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError:
+                    return True
+                self._journal_lines += 1
+                if event["seq"] <= snapshot_seq:
+                    continue
+                self.pet.apply_journal_event(event)
+                self._journal_seq = event["seq"]
+        return False
+    def _should_fsync(self, durable):
+        policy = self._setting("fsync_policy", "on_quit")
+        if policy not in FSYNC_POLICIES:
+            policy = "on_quit"
+        return policy == "always" or (policy == "on_quit" and durable)
+    def save_game(self, durable=False, wait=False):
+        if not self.pet:
+            return False
+        try:
+            if self.store is not None:
+                self.store.save_pet(self.pet)
+                if durable and self._should_fsync(durable):
+                    self.store.sync()
+            elif self._can_append_journal():
+                self._append_journal(durable)
+            else:
+                self._write_snapshot(durable)
+            self._mark_saved()
+        except Exception:
+            return False
+        if durable or wait:
+            return self.flush_saves()
+        return True
+    def flush_saves(self):
+        self._settle_writes()
+        return not self._collect_writer_errors()
+    def _collect_writer_errors(self):
+        errors = self.writer.take_errors() if self.writer is not None else []
+        if errors:
+            self._saved_version = None
+            self.save_errors.extend(errors)
+        return errors
+    def take_save_errors(self):
+        self._collect_writer_errors()
+        errors, self.save_errors = self.save_errors, []
+        return errors
+    def _settle_writes(self):
+        if self.writer is not None:
+            self.writer.flush()
+    def _can_append_journal(self):
+        return (
+            self.pet.journal is not None
+            and self._saved_version is not None
+            and self.pet.journal_version == self.pet.state_version
+            and self._journal_lines < self._setting("journal_compact_events", 500)
+        )
+    def _append_journal(self, durable):
+        if not self.pet.journal:
+            return
+        seq = self._journal_seq
+        lines = []
+        for event in self.pet.journal:
+            seq += 1
+            lines.append(json.dumps({"seq": seq, **event}, separators=(",", ":")))
+        with open(self.journal_file, 'a') as f:
+            f.write("\n".join(lines) + "\n")
+            if self._should_fsync(durable):
+                f.flush()
+                os.fsync(f.fileno())
+        self._journal_seq = seq
+        self._journal_lines += len(lines)
+        self.pet.journal.clear()
+    def _write_snapshot(self, durable):
+        data = self.pet.to_dict(epoch_timestamps=self.serializer.epoch_timestamps)
+        if self._journal_seq:
+            data["journal_seq"] = self._journal_seq
+        header = {key: data[key] for key in Pet.SAVE_HEADER_FIELDS}
+        if self._journal_seq:
+            header["journal_seq"] = self._journal_seq
+        payload = self.serializer.dumps(data, header)
+        writer = self._save_writer()
+        if writer is not None:
+            writer.submit(self.save_file, payload, fsync=self._should_fsync(durable))
+        else:
+            atomic_write_file(self.save_file, payload, fsync=self._should_fsync(durable))
+        self._document_cache = None
+        if os.path.exists(self.journal_file):
+            self._settle_writes()
+            os.remove(self.journal_file)
+        self._journal_lines = 0
+        if self.pet.journal is not None:
+            self.pet.journal.clear()
+            self.pet.journal_version = self.pet.state_version
+    def compact_journal(self):
         if not self.pet:
             return False
         try:
-            with open(self.save_file, 'w') as f:
-                json.dump(self.pet.to_dict(), f, indent=2)
+            self._write_snapshot(durable=False)
+            self._mark_saved()
             return True
         except Exception:
             return False
+    def _mark_saved(self):
+        self._saved_version = self.pet.state_version
+        self._last_save_time = time.monotonic()
+    def has_unsaved_changes(self):
+        if not self.pet:
+            return False
+        return self._saved_version is None or self.pet.state_version != self._saved_version
     def has_save_file(self):
+        if self.store is not None:
+            return self.store.count_pets() > 0
+        self._settle_writes()
         return os.path.exists(self.save_file)
     def delete_save_file(self):
+        self.flush_saves()
         try:
-            if os.path.exists(self.save_file):
-                os.remove(self.save_file)
+            if self.store is not None:
+                if self.pet:
+                    self.store.delete_pet(self.pet.pet_id)
+                return True
+            for path in (self.save_file, self.journal_file):
+                if os.path.exists(path):
+                    os.remove(path)
             return True
         except Exception:
             return False
     def get_save_info(self):
+        if self.store is not None:
+            pet_id = self.pet.pet_id if self.pet else self.store.most_recent_pet_id()
+            return self.store.get_header(pet_id) if pet_id else None
         if not os.path.exists(self.save_file):
             return None
         try:
-            with open(self.save_file, 'r') as f:
-                data = json.load(f)
-            birth_time = datetime.fromisoformat(data["birth_time"])
+            header = self._read_save_header()
+            if header is None:
+                data = self._read_document()
+                header = {key: data.get(key) for key in Pet.SAVE_HEADER_FIELDS + ("journal_seq",)}
+            last_event = self._read_journal_tail()
+            if last_event is not None and last_event.get("seq", 0) > (header.get("journal_seq") or 0):
+                for key in ("level", "health", "last_interaction"):
+                    header[key] = last_event["core"][key]
+            birth_time = parse_timestamp(header["birth_time"])
             age_delta = datetime.now() - birth_time
             return {
-                "name": data["name"],
-                "species": data.get("species", "Generic"),
-                "level": data["level"],
+                "pet_id": header.get("pet_id"),
+                "name": header["name"],
+                "species": header.get("species") or "Generic",
+                "level": header["level"],
                 "age_days": age_delta.days,
-                "last_interaction": data["last_interaction"],
-                "health": data["health"]
+                "last_interaction": format_timestamp(parse_timestamp(header["last_interaction"])),
+                "health": header["health"]
             }
         except Exception:
             return None
+    def auto_save_due(self):
+        if not (self.pet and self.game_active) or not self.has_unsaved_changes():
+            return False
+        if self._saved_version is not None:
+            pending_changes = self.pet.state_version - self._saved_version
+            min_changes = self._setting("auto_save_min_changes", 1)
+            min_interval = self._setting("auto_save_interval_seconds", 0)
+            elapsed = time.monotonic() - self._last_save_time
+            if pending_changes < min_changes and (not min_interval or elapsed < min_interval):
+                return False
+        return True
     def auto_save(self):
-        if self.pet and self.game_active:
-            self.save_game()
+        return self.save_game() if self.auto_save_due() else False
+def save_managers(managers, due_only=True):
+    batches = {}
+    for manager in managers:
+        due = manager.auto_save_due() if due_only else manager.has_unsaved_changes()
+        if manager.store is not None and due:
+            batches.setdefault(id(manager.store), (manager.store, []))[1].append(manager)
+    saved = 0
+    for store, batch in batches.values():
+        store.save_pets([manager.pet for manager in batch])
+        for manager in batch:
+            manager._mark_saved()
+        saved += len(batch)
+    return saved
 class GameStats:
-    def __init__(self, stats_file="game_stats.json"):
+    def __init__(self, stats_file="game_stats.json", write_behind=False, flush_every=20, flush_interval_seconds=10):
         self.stats_file = stats_file
+        self.write_behind = write_behind
+        self.flush_every = flush_every
+        self.flush_interval_seconds = flush_interval_seconds
+        self._pending_updates = 0
+        self._flush_timer = None
+        self._lock = threading.RLock()
         self.stats = {
             "total_pets_created": 0,
             "total_interactions": 0,
@@ -76,6 +421,8 @@ class GameStats:
             "last_game_session": None
         }
         self.load_stats()
+        if self.write_behind:
+            atexit.register(self.flush)
     def load_stats(self):
         if os.path.exists(self.stats_file):
             try:
@@ -86,23 +433,45 @@ class GameStats:
                 pass
     def save_stats(self):
         try:
-            with open(self.stats_file, 'w') as f:
-                json.dump(self.stats, f, indent=2)
+            with self._lock:
+                atomic_write_file(self.stats_file, json.dumps(self.stats, indent=2))
         except Exception:
             pass
+    def flush(self):
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if self._pending_updates:
+                self._pending_updates = 0
+                self.save_stats()
+    def _record_change(self):
+        if not self.write_behind:
+            self.save_stats()
+            return
+        self._pending_updates += 1
+        if self._pending_updates >= self.flush_every:
+            self.flush()
+        elif self._flush_timer is None and self.flush_interval_seconds:
+            self._flush_timer = threading.Timer(self.flush_interval_seconds, self.flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
     def update_pet_created(self, pet):
-        self.stats["total_pets_created"] += 1
-        if not self.stats["first_pet_created"]:
-            self.stats["first_pet_created"] = datetime.now().isoformat()
-        self.save_stats()
+        with self._lock:
+            self.stats["total_pets_created"] += 1
+            if not self.stats["first_pet_created"]:
+                self.stats["first_pet_created"] = datetime.now().isoformat()
+            self._record_change()
     def update_interaction(self):
-        self.stats["total_interactions"] += 1
-        self.stats["last_game_session"] = datetime.now().isoformat()
-        self.save_stats()
+        with self._lock:
+            self.stats["total_interactions"] += 1
+            self.stats["last_game_session"] = datetime.now().isoformat()
+            self._record_change()
     def update_pet_level(self, level):
-        if level > self.stats["highest_level_reached"]:
-            self.stats["highest_level_reached"] = level
-            self.save_stats()
+        with self._lock:
+            if level > self.stats["highest_level_reached"]:
+                self.stats["highest_level_reached"] = level
+                self._record_change()
     def get_stats_summary(self):
         return {
             "Total Pets Created": self.stats["total_pets_created"],
@@ -116,9 +485,28 @@ class GameConfig:
         self.config_file = config_file
         self.config = {
             "auto_save": True,
+            "auto_save_min_changes": 5,
+            "auto_save_interval_seconds": 30,
+            "fsync_policy": "on_quit",
+            "journal_mode": False,
+            "journal_compact_events": 500,
+            "async_save": False,
+            "async_save_max_pending": 4,
+            "pet_store": None,
+            "save_format": "json",
+            "memory_capacity": 100,
+            "columnar_memory": False,
+            "actions_file": None,
+            "stats_write_behind": True,
+            "stats_flush_every": 20,
+            "stats_flush_interval_seconds": 10,
             "max_pet_name_length": 20,
             "difficulty_level": "normal",
-            "debug_mode": False
+            "debug_mode": False,
+            "profile_file": "cli_profile.json",
+            "server_store": "server_pets.db",
+            "server_tick_seconds": 60,
+            "server_save_interval_seconds": 30
         }
         self.load_config()
     def load_config(self):
@@ -131,8 +519,7 @@ class GameConfig:
                 pass
     def save_config(self):
         try:
-            with open(self.config_file, 'w') as f:
-                json.dump(self.config, f, indent=2)
+            atomic_write_file(self.config_file, json.dumps(self.config, indent=2))
         except Exception:
             pass
     def get_setting(self, key, default=None):
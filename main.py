@@ -1,8 +1,26 @@
 import sys
 import os
+import argparse
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from cli import TerminalPetsCLI
 def main():
+    parser = argparse.ArgumentParser(description="Terminal Pets")
+    parser.add_argument("--batch", nargs="?", const="-", metavar="FILE",
+                        help="run commands from FILE (or stdin) and print one JSON result per command")
+    parser.add_argument("--serve", nargs="?", const="127.0.0.1:8765", metavar="ADDRESS",
+                        help="host pets for many clients on host:port or a Unix socket path")
+    parser.add_argument("--connect", nargs="?", const="127.0.0.1:8765", metavar="ADDRESS",
+                        help="connect to a running pet server")
+    args = parser.parse_args()
+    if args.batch is not None:
+        from batch import run_batch
+        sys.exit(run_batch(args.batch))
+    if args.serve is not None:
+        import server
+        sys.exit(server.main([args.serve]))
+    if args.connect is not None:
+        import client
+        sys.exit(client.main([args.connect]))
     try:
         cli = TerminalPetsCLI()
         cli.start()
@@ -12,4 +30,4 @@ def main():
         print(f"Fatal error: {e}")
         sys.exit(1)
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
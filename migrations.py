@@ -0,0 +1,99 @@
+import os
+import sys
+import uuid
+from pet import Pet
+from serializers import detect_serializer
+CURRENT_SCHEMA_VERSION = Pet.SCHEMA_VERSION
+SKIPPED_SUFFIXES = (".journal", ".tmp")
+PET_DOCUMENT_KEYS = ("name", "birth_time", "last_interaction")
+def is_pet_document(data):
+    return isinstance(data, dict) and all(key in data for key in PET_DOCUMENT_KEYS)
+def _upgrade_unversioned(data):
+    data.setdefault("pet_id", uuid.uuid4().hex)
+    data.setdefault("species", "Generic")
+    data.setdefault("last_passive_update", data["last_interaction"])
+    data.setdefault("interactions_today", 0)
+    data.setdefault("total_interactions", 0)
+    data.setdefault("last_fed", None)
+    data.setdefault("last_played", None)
+    data.setdefault("mood", "neutral")
+    data.setdefault("evolution_stage", "baby")
+    data.setdefault("evolution_points", 0)
+    data.setdefault("favorite_activities", {})
+    data.setdefault("preferred_foods", {})
+    data.setdefault("rng_state", None)
+    for trait_data in data.get("personality_traits", {}).values():
+        trait_data.setdefault("development_history", [])
+    memory_data = data.get("memory")
+    if memory_data is not None:
+        memory_data.setdefault("max_memories", 100)
+        memory_data.setdefault("columnar", False)
+        memory_data.setdefault("experiences", [])
+        memory_data.setdefault("preferences", {})
+        memory_data.setdefault("time_patterns", {})
+        memory_data.setdefault("behavior_patterns", {})
+    return data
+MIGRATIONS = {0: _upgrade_unversioned}
+def migrate_document(data):
+    version = data.get("schema_version", 0)
+    if version > CURRENT_SCHEMA_VERSION:
+        raise ValueError(f"Save schema {version} is newer than supported schema {CURRENT_SCHEMA_VERSION}")
+    while version < CURRENT_SCHEMA_VERSION:
+        data = MIGRATIONS[version](data)
+        version += 1
+    data["schema_version"] = version
+    return data
+def needs_migration(data):
+    return data.get("schema_version", 0) != CURRENT_SCHEMA_VERSION
+def migrate_file(path):
+    from game_manager import atomic_write_file
+    with open(path, 'rb') as f:
+        raw = f.read()
+    serializer = detect_serializer(raw[:16])
+    if serializer is None:
+        return "skipped"
+    data = serializer.loads(raw)
+    if not is_pet_document(data):
+        return "skipped"
+    if not needs_migration(data):
+        return "current"
+    data = migrate_document(data)
+    header = {key: data[key] for key in Pet.SAVE_HEADER_FIELDS}
+    if data.get("journal_seq"):
+        header["journal_seq"] = data["journal_seq"]
+    atomic_write_file(path, serializer.dumps(data, header), fsync=True)
+    return "migrated"
+def migrate_directory(directory):
+    results = {"migrated": 0, "current": 0, "skipped": 0, "failed": {}}
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if not entry.is_file() or entry.name.endswith(SKIPPED_SUFFIXES):
+                continue
+            try:
+                results[migrate_file(entry.path)] += 1
+            except (KeyError, ValueError, EOFError, TypeError, OSError) as e:
+                results["failed"][entry.name] = str(e)
+    return results
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print("Usage: python migrations.py <save directory or file>...")
+        return 2
+    failed = 0
+    for target in argv:
+        if os.path.isdir(target):
+            results = migrate_directory(target)
+            print(f"{target}: {results['migrated']} migrated, {results['current']} already current, "
+                  f"{results['skipped']} not pet saves")
+            for name, error in results["failed"].items():
+                print(f"  {name}: {error}")
+            failed += len(results["failed"])
+        else:
+            try:
+                print(f"{target}: {migrate_file(target)}")
+            except (KeyError, ValueError, EOFError, TypeError, OSError) as e:
+                print(f"{target}: {e}")
+                failed += 1
+    return 1 if failed else 0
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,28 +2,316 @@ import json
 import time
 import random
 import hashlib
-from datetime import datetime, timedelta
+import functools
+import uuid
+import zlib
+from array import array
+from datetime import date, datetime, timedelta
+from types import MappingProxyType
 from typing import Dict, List, Optional, Tuple
+from actions import ACTION_REGISTRY, SITUATION_RESPONSES, FAVORITE_RESPONSES, feeding_happiness, play_effect
+try:
+    import numpy
+except ImportError:
+    numpy = None
+def format_timestamp(value, epoch=False):
+    if value is None:
+        return None
+    return int(value.timestamp()) if epoch else value.isoformat()
+def parse_timestamp(value):
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value)
+    return datetime.fromisoformat(value)
+def format_date(value, epoch=False):
+    return value.toordinal() if epoch else value.isoformat()
+def parse_date(value):
+    if isinstance(value, int):
+        return date.fromordinal(value)
+    return datetime.fromisoformat(value).date()
+def journaled(op):
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if self.journal is None or self._journal_marker is not None:
+                return method(self, *args, **kwargs)
+            self._journal_marker = self._journal_snapshot_marker()
+            try:
+                result = method(self, *args, **kwargs)
+            finally:
+                marker, self._journal_marker = self._journal_marker, None
+            self._record_journal_event(op, marker)
+            return result
+        return wrapper
+    return decorator
+class PetRandom(random.Random):
+    MASK = (1 << 64) - 1
+    def seed(self, a=None, version=2):
+        if a is None:
+            a = EnvironmentSensor.get_entropy_seed()
+        if not isinstance(a, int):
+            a = zlib.crc32(str(a).encode())
+        self._state = a & self.MASK
+        self.gauss_next = None
+    @classmethod
+    def mix(cls, value):
+        value = (value + 0x9E3779B97F4A7C15) & cls.MASK
+        value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & cls.MASK
+        value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & cls.MASK
+        return value ^ (value >> 31)
+    def _next(self):
+        self._state = (self._state + 0x9E3779B97F4A7C15) & self.MASK
+        return self.mix(self._state - 0x9E3779B97F4A7C15)
+    def random(self):
+        return (self._next() >> 11) * (1.0 / (1 << 53))
+    def getrandbits(self, k):
+        if k <= 64:
+            return self._next() >> (64 - k) if k else 0
+        bits = 0
+        for shift in range(0, k, 64):
+            bits |= self._next() << shift
+        return bits & ((1 << k) - 1)
+    def getstate(self):
+        return self._state
+    def setstate(self, state):
+        self._state = state & self.MASK
+        self.gauss_next = None
+class Record:
+    __slots__ = ()
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+    def __contains__(self, key):
+        return key in self.__slots__
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self.__slots__ else default
+    def keys(self):
+        return self.__slots__
+    def __eq__(self, other):
+        return type(self) is type(other) and all(getattr(self, key) == getattr(other, key) for key in self.__slots__)
+    def __repr__(self):
+        fields = ", ".join(f"{key}={getattr(self, key)!r}" for key in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+class TraitChange(Record):
+    __slots__ = ("timestamp", "old_value", "new_value", "change", "reason")
+    def __init__(self, timestamp, old_value, new_value, change, reason):
+        self.timestamp = timestamp
+        self.old_value = old_value
+        self.new_value = new_value
+        self.change = change
+        self.reason = reason
+class Experience(Record):
+    __slots__ = ("timestamp", "type", "details", "emotional_impact", "context")
+    def __init__(self, timestamp, type, details, emotional_impact, context):
+        self.timestamp = timestamp
+        self.type = type
+        self.details = details
+        self.emotional_impact = emotional_impact
+        self.context = context
+class RingBuffer:
+    __slots__ = ("capacity", "_items", "_start")
+    def __init__(self, capacity, items=()):
+        self.capacity = max(1, capacity)
+        self._items = []
+        self._start = 0
+        for item in items:
+            self.append(item)
+    def append(self, item):
+        if len(self._items) < self.capacity:
+            self._items.append(item)
+        else:
+            self._items[self._start] = item
+            self._start = (self._start + 1) % self.capacity
+    def extend(self, items):
+        for item in items:
+            self.append(item)
+    def clear(self):
+        self._items = []
+        self._start = 0
+    def __len__(self):
+        return len(self._items)
+    def __iter__(self):
+        items, start = self._items, self._start
+        for index in range(start, len(items)):
+            yield items[index]
+        for index in range(start):
+            yield items[index]
+    def __getitem__(self, index):
+        size = len(self._items)
+        if isinstance(index, slice):
+            return [self._items[(self._start + i) % size] for i in range(*index.indices(size))]
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("ring buffer index out of range")
+        return self._items[(self._start + index) % size]
+    def __repr__(self):
+        return f"RingBuffer(capacity={self.capacity}, items={list(self)!r})"
+class ColumnarExperienceStore:
+    def __init__(self, capacity, items=()):
+        self.capacity = max(1, capacity)
+        self.types = []
+        self._type_codes = {}
+        self.timestamps = array('d')
+        self.type_codes = array('H')
+        self.impacts = array('d')
+        self.hours = array('B')
+        self.weekdays = array('B')
+        self.details = []
+        self._start = 0
+        for item in items:
+            self.append(item)
+    def _type_code(self, experience_type):
+        code = self._type_codes.get(experience_type)
+        if code is None:
+            code = self._type_codes[experience_type] = len(self.types)
+            self.types.append(experience_type)
+        return code
+    def append(self, experience):
+        timestamp = experience["timestamp"]
+        row = (
+            timestamp.timestamp(),
+            self._type_code(experience["type"]),
+            experience["emotional_impact"],
+            timestamp.hour,
+            timestamp.weekday()
+        )
+        columns = (self.timestamps, self.type_codes, self.impacts, self.hours, self.weekdays)
+        if len(self.details) < self.capacity:
+            for column, value in zip(columns, row):
+                column.append(value)
+            self.details.append(experience["details"])
+        else:
+            index = self._start
+            for column, value in zip(columns, row):
+                column[index] = value
+            self.details[index] = experience["details"]
+            self._start = (index + 1) % self.capacity
+    def clear(self):
+        self.__init__(self.capacity)
+    def _row(self, index):
+        timestamp = datetime.fromtimestamp(self.timestamps[index])
+        return Experience(
+            timestamp,
+            self.types[self.type_codes[index]],
+            self.details[index],
+            self.impacts[index],
+            PetMemory.shared_context(self.hours[index], self.weekdays[index], timestamp.month)
+        )
+    def __len__(self):
+        return len(self.details)
+    def __iter__(self):
+        size, start = len(self.details), self._start
+        for offset in range(size):
+            yield self._row((start + offset) % size)
+    def __getitem__(self, index):
+        size = len(self.details)
+        if isinstance(index, slice):
+            return [self._row((self._start + i) % size) for i in range(*index.indices(size))]
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("experience index out of range")
+        return self._row((self._start + index) % size)
+    def average_impact_by_type(self):
+        if numpy is not None and self.details:
+            codes = numpy.frombuffer(self.type_codes, dtype=numpy.uint16)
+            counts = numpy.bincount(codes, minlength=len(self.types))
+            totals = numpy.bincount(codes, weights=numpy.frombuffer(self.impacts, dtype=numpy.float64), minlength=len(self.types))
+            return {self.types[code]: float(totals[code] / counts[code]) for code in range(len(self.types)) if counts[code]}
+        counts = [0] * len(self.types)
+        totals = [0.0] * len(self.types)
+        for type_code, impact in zip(self.type_codes, self.impacts):
+            counts[type_code] += 1
+            totals[type_code] += impact
+        return {self.types[code]: totals[code] / counts[code] for code in range(len(self.types)) if counts[code]}
+class PreferenceTable:
+    __slots__ = ("total_key", "count_key", "entries", "_best", "_ranked")
+    def __init__(self, total_key, count_key, entries=None):
+        self.total_key = total_key
+        self.count_key = count_key
+        self.entries = entries if entries is not None else {}
+        self._rescan()
+    def average(self, name):
+        data = self.entries[name]
+        return data[self.total_key] / max(1, data[self.count_key])
+    def _rescan(self):
+        self._best = max(self.entries, key=self.average) if self.entries else None
+        self._ranked = None
+    def record(self, name, amount):
+        data = self.entries.get(name)
+        if data is None:
+            data = self.entries[name] = {self.total_key: 0, self.count_key: 0}
+        previous = self.average(name)
+        data[self.total_key] += amount
+        data[self.count_key] += 1
+        self._ranked = None
+        best = self._best
+        if best is None:
+            self._best = name
+        elif name == best:
+            if self.average(name) < previous:
+                self._rescan()
+        elif self.average(name) > self.average(best):
+            self._best = name
+        elif self.average(name) == self.average(best):
+            self._rescan()
+    def best(self):
+        return self._best
+    def ranked(self):
+        if self._ranked is None:
+            self._ranked = sorted(((name, self.average(name)) for name in self.entries), key=lambda x: x[1], reverse=True)
+        return self._ranked
 class PersonalityTrait:
-    def __init__(self, name, base_strength=50, min_val=0, max_val=100):
+    __slots__ = ("name", "strength", "min_val", "max_val", "_history", "_raw_history", "last_changed", "change_version")
+    def __init__(self, name, base_strength=50, min_val=0, max_val=100, max_history=50):
         self.name = name
         self.strength = base_strength
         self.min_val = min_val
         self.max_val = max_val
-        self.development_history = []
-        self.last_changed = datetime.now()
+        self._history = RingBuffer(max_history)
+        self._raw_history = None
+        self.last_changed = EnvironmentSensor.now()
+        self.change_version = 0
+    @property
+    def development_history(self):
+        if self._raw_history is not None:
+            raw, self._raw_history = self._raw_history, None
+            self._history.extend(PersonalityTrait.deserialize_history_entry(entry) for entry in raw)
+        return self._history
+    def load_raw_history(self, raw):
+        self._raw_history = list(raw) if raw else None
+    def serialized_history(self, epoch=False, limit=10):
+        if self._raw_history is not None:
+            return self._raw_history[-limit:]
+        return [PersonalityTrait.serialize_history_entry(entry, epoch) for entry in self._history[-limit:]]
     def modify(self, change_amount, reason=""):
         old_strength = self.strength
         self.strength = max(self.min_val, min(self.max_val, self.strength + change_amount))
         if self.strength != old_strength:
-            self.development_history.append({
-                "timestamp": datetime.now(),
-                "old_value": old_strength,
-                "new_value": self.strength,
-                "change": change_amount,
-                "reason": reason
-            })
-            self.last_changed = datetime.now()
+            self.development_history.append(TraitChange(EnvironmentSensor.now(), old_strength, self.strength, change_amount, reason))
+            self.last_changed = EnvironmentSensor.now()
+            self.change_version += 1
+    @staticmethod
+    def serialize_history_entry(entry, epoch=False):
+        return {
+            "timestamp": format_timestamp(entry["timestamp"], epoch),
+            "old_value": entry["old_value"],
+            "new_value": entry["new_value"],
+            "change": entry["change"],
+            "reason": entry["reason"]
+        }
+    @staticmethod
+    def deserialize_history_entry(data):
+        return TraitChange(
+            parse_timestamp(data["timestamp"]),
+            data["old_value"],
+            data["new_value"],
+            data["change"],
+            data["reason"]
+        )
     def get_level(self):
         if self.strength >= 80:
             return "very high"
@@ -36,32 +324,81 @@ class PersonalityTrait:
         else:
             return "very low"
 class PetMemory:
-    def __init__(self, max_memories=100):
+    __slots__ = (
+        "max_memories", "max_context_samples", "columnar", "_experiences", "_raw_experiences",
+        "behavior_patterns", "preferences", "time_patterns", "hour_totals", "_most_active_hour", "sequence"
+    )
+    _contexts = {}
+    def __init__(self, max_memories=100, max_context_samples=10, columnar=False):
         self.max_memories = max_memories
-        self.experiences = []
+        self.max_context_samples = max_context_samples
+        self.columnar = columnar
+        self._experiences = ColumnarExperienceStore(max_memories) if columnar else RingBuffer(max_memories)
+        self._raw_experiences = None
         self.behavior_patterns = {}
         self.preferences = {}
         self.time_patterns = {}
+        self.hour_totals = {}
+        self._most_active_hour = None
+        self.sequence = 0
+    @property
+    def experiences(self):
+        if self._raw_experiences is not None:
+            raw, self._raw_experiences = self._raw_experiences, None
+            for data in raw:
+                self._experiences.append(PetMemory.deserialize_experience(data))
+        return self._experiences
+    @property
+    def experience_count(self):
+        if self._raw_experiences is not None:
+            return min(len(self._raw_experiences), self.max_memories)
+        return len(self._experiences)
+    def load_raw_experiences(self, raw):
+        self._raw_experiences = list(raw) if raw else None
+    def serialized_experiences(self, epoch=False, limit=50):
+        if self._raw_experiences is not None:
+            return self._raw_experiences[-limit:]
+        return [PetMemory.serialize_experience(exp, epoch) for exp in self._experiences[-limit:]]
     def add_experience(self, experience_type, details, emotional_impact=0):
-        experience = {
-            "timestamp": datetime.now(),
-            "type": experience_type,
-            "details": details,
-            "emotional_impact": emotional_impact,
-            "context": self._get_current_context()
-        }
+        self.record_experience(Experience(EnvironmentSensor.now(), experience_type, details, emotional_impact, self._get_current_context()))
+    def record_experience(self, experience):
         self.experiences.append(experience)
-        if len(self.experiences) > self.max_memories:
-            self.experiences = self.experiences[-self.max_memories:]
+        self.sequence += 1
         self._update_patterns(experience)
-    def _get_current_context(self):
-        now = datetime.now()
+    @staticmethod
+    def serialize_experience(experience, epoch=False):
         return {
-            "hour": now.hour,
-            "day_of_week": now.weekday(),
-            "month": now.month,
-            "season": self._get_season(now.month)
+            "timestamp": format_timestamp(experience["timestamp"], epoch),
+            "type": experience["type"],
+            "details": experience["details"],
+            "emotional_impact": experience["emotional_impact"],
+            "context": experience["context"]
         }
+    @staticmethod
+    def deserialize_experience(data):
+        context = data["context"]
+        return Experience(
+            parse_timestamp(data["timestamp"]),
+            data["type"],
+            data["details"],
+            data["emotional_impact"],
+            PetMemory.shared_context(context["hour"], context["day_of_week"], context["month"])
+        )
+    @classmethod
+    def shared_context(cls, hour, day_of_week, month):
+        key = (hour, day_of_week, month)
+        context = cls._contexts.get(key)
+        if context is None:
+            context = cls._contexts[key] = {
+                "hour": hour,
+                "day_of_week": day_of_week,
+                "month": month,
+                "season": EnvironmentSensor._get_season(month)
+            }
+        return context
+    def _get_current_context(self):
+        now = EnvironmentSensor.now()
+        return self.shared_context(now.hour, now.weekday(), now.month)
     def _get_season(self, month):
         if month in [12, 1, 2]:
             return "winter"
@@ -75,15 +412,70 @@ class PetMemory:
         exp_type = experience["type"]
         context = experience["context"]
         if exp_type not in self.behavior_patterns:
-            self.behavior_patterns[exp_type] = {"count": 0, "contexts": []}
-        self.behavior_patterns[exp_type]["count"] += 1
-        self.behavior_patterns[exp_type]["contexts"].append(context)
+            self.behavior_patterns[exp_type] = self._new_pattern()
+        self._count_context(self.behavior_patterns[exp_type], context, self.max_context_samples)
         hour = context["hour"]
         if hour not in self.time_patterns:
             self.time_patterns[hour] = {}
         if exp_type not in self.time_patterns[hour]:
             self.time_patterns[hour][exp_type] = 0
         self.time_patterns[hour][exp_type] += 1
+        total = self.hour_totals[hour] = self.hour_totals.get(hour, 0) + 1
+        best = self._most_active_hour
+        if best is None or total > self.hour_totals[best]:
+            self._most_active_hour = hour
+        elif total == self.hour_totals[best] and hour != best:
+            self._most_active_hour = self._first_busiest_hour()
+    def load_time_patterns(self, patterns):
+        self.time_patterns = {int(hour): counts for hour, counts in patterns.items()}
+        self.hour_totals = {hour: sum(counts.values()) for hour, counts in self.time_patterns.items()}
+        self._most_active_hour = self._first_busiest_hour()
+    def _first_busiest_hour(self):
+        return max(self.hour_totals, key=self.hour_totals.get) if self.hour_totals else None
+    @property
+    def most_active_hour(self):
+        return self._most_active_hour
+    @staticmethod
+    def _new_pattern():
+        return {"count": 0, "by_hour": {}, "by_weekday": {}, "by_season": {}, "samples": []}
+    @staticmethod
+    def _count_context(pattern, context, max_samples):
+        pattern["count"] += 1
+        for key, bucket in (("hour", "by_hour"), ("day_of_week", "by_weekday"), ("season", "by_season")):
+            value = context.get(key)
+            if value is not None:
+                pattern[bucket][value] = pattern[bucket].get(value, 0) + 1
+        if max_samples:
+            pattern["samples"].append(context)
+            if len(pattern["samples"]) > max_samples:
+                del pattern["samples"][:-max_samples]
+    @classmethod
+    def migrate_behavior_patterns(cls, patterns, max_samples=10):
+        migrated = {}
+        for exp_type, data in patterns.items():
+            if "contexts" in data:
+                pattern = cls._new_pattern()
+                for context in data["contexts"]:
+                    cls._count_context(pattern, context, max_samples)
+                pattern["count"] = max(pattern["count"], data.get("count", 0))
+            else:
+                pattern = {
+                    "count": data.get("count", 0),
+                    "by_hour": {int(hour): count for hour, count in data.get("by_hour", {}).items()},
+                    "by_weekday": {int(day): count for day, count in data.get("by_weekday", {}).items()},
+                    "by_season": dict(data.get("by_season", {})),
+                    "samples": list(data.get("samples", []))[-max_samples:] if max_samples else []
+                }
+            migrated[exp_type] = pattern
+        return migrated
+    def average_impact_by_type(self):
+        if self.columnar:
+            return self.experiences.average_impact_by_type()
+        totals = {}
+        for experience in self.experiences:
+            total, count = totals.get(experience["type"], (0.0, 0))
+            totals[experience["type"]] = (total + experience["emotional_impact"], count + 1)
+        return {exp_type: total / count for exp_type, (total, count) in totals.items()}
     def get_preferred_activity_time(self, activity_type):
         best_hour = 12  
         max_count = 0
@@ -95,7 +487,17 @@ class PetMemory:
         return best_hour
     def get_experience_count(self, experience_type):
         return self.behavior_patterns.get(experience_type, {}).get("count", 0)
+class EnvironmentSnapshot(Record):
+    __slots__ = ("hour", "month", "season", "time_modifier", "seasonal_modifier")
+    def __init__(self, hour, month, season, time_modifier, seasonal_modifier):
+        self.hour = hour
+        self.month = month
+        self.season = season
+        self.time_modifier = time_modifier
+        self.seasonal_modifier = seasonal_modifier
 class EnvironmentSensor:
+    _clock = datetime.now
+    _snapshots = {}
     @staticmethod
     def get_entropy_seed():
         import os
@@ -103,8 +505,7 @@ class EnvironmentSensor:
         entropy_data = f"{time.time()}{os.getpid()}{random.random()}"
         return int(hashlib.md5(entropy_data.encode()).hexdigest()[:8], 16)
     @staticmethod
-    def get_time_of_day_modifier():
-        hour = datetime.now().hour
+    def _time_of_day_modifier(hour):
         if 6 <= hour < 10:  
             return {"energy": 1.1, "happiness": 1.0, "activity_preference": "training"}
         elif 10 <= hour < 14:  
@@ -116,9 +517,7 @@ class EnvironmentSensor:
         else:  
             return {"energy": 0.6, "happiness": 0.9, "activity_preference": "rest"}
     @staticmethod
-    def get_seasonal_modifier():
-        month = datetime.now().month
-        season = EnvironmentSensor._get_season(month)
+    def _seasonal_modifier(season):
         modifiers = {
             "spring": {"happiness": 1.2, "energy": 1.1, "health": 1.05},
             "summer": {"happiness": 1.1, "energy": 1.2, "health": 1.0},
@@ -126,6 +525,35 @@ class EnvironmentSensor:
             "winter": {"happiness": 0.8, "energy": 0.9, "health": 0.95}
         }
         return modifiers.get(season, {"happiness": 1.0, "energy": 1.0, "health": 1.0})
+    @classmethod
+    def now(cls):
+        return cls._clock()
+    @classmethod
+    def set_clock(cls, clock=None):
+        cls._clock = clock or datetime.now
+    @classmethod
+    def snapshot(cls, now=None):
+        if now is None:
+            now = cls._clock()
+        key = (now.hour, now.month)
+        cached = cls._snapshots.get(key)
+        if cached is not None:
+            return cached
+        season = cls._get_season(now.month)
+        cached = cls._snapshots[key] = EnvironmentSnapshot(
+            now.hour,
+            now.month,
+            season,
+            MappingProxyType(cls._time_of_day_modifier(now.hour)),
+            MappingProxyType(cls._seasonal_modifier(season))
+        )
+        return cached
+    @classmethod
+    def get_time_of_day_modifier(cls):
+        return cls.snapshot().time_modifier
+    @classmethod
+    def get_seasonal_modifier(cls):
+        return cls.snapshot().seasonal_modifier
     @staticmethod
     def _get_season(month):
         if month in [12, 1, 2]:
@@ -136,12 +564,41 @@ class EnvironmentSensor:
             return "summer"
         else:
             return "autumn"
+MOOD_TABLE = (
+    (90, ("blissful", "euphoric", "radiant", "transcendent")),
+    (80, ("ecstatic", "joyful", "elated", "exuberant")),
+    (70, ("happy", "cheerful", "upbeat", "content")),
+    (60, ("pleased", "satisfied", "positive", "good")),
+    (50, ("neutral", "calm", "steady", "balanced")),
+    (40, ("subdued", "quiet", "pensive", "reflective")),
+    (30, ("sad", "melancholy", "downcast", "blue")),
+    (20, ("distressed", "troubled", "upset", "worried")),
+    (10, ("miserable", "dejected", "despondent", "anguished")),
+    (float("-inf"), ("devastated", "broken", "hopeless", "despairing"))
+)
 class Pet:
-    def __init__(self, name, species="Generic"):
+    __slots__ = (
+        "pet_id", "name", "species", "birth_time", "last_interaction", "last_passive_update",
+        "hunger", "happiness", "energy", "health", "level", "experience",
+        "total_interactions", "interactions_today", "last_fed", "last_played",
+        "personality_traits", "memory", "behavioral_adaptations", "environmental_sensitivity",
+        "mood", "evolution_stage", "evolution_points", "current_entropy_seed",
+        "_frequency_history", "_raw_frequency_history", "_activity_preferences", "_food_preferences",
+        "circadian_preferences", "seasonal_adaptations",
+        "rng", "change_version", "journal", "journal_version", "_journal_marker"
+    )
+    PASSIVE_STEP_HOURS = 1.0
+    SAVE_HEADER_FIELDS = ("pet_id", "name", "species", "level", "health", "birth_time", "last_interaction")
+    SCHEMA_VERSION = 1
+    def __init__(self, name, species="Generic", memory_capacity=100, columnar_memory=False, seed=None):
+        self.current_entropy_seed = seed if seed is not None else EnvironmentSensor.get_entropy_seed()
+        self.rng = PetRandom(self.current_entropy_seed)
+        self.pet_id = uuid.uuid4().hex
         self.name = name
         self.species = species
-        self.birth_time = datetime.now()
-        self.last_interaction = datetime.now()
+        self.birth_time = EnvironmentSensor.now()
+        self.last_interaction = self.birth_time
+        self.last_passive_update = self.birth_time
         self.hunger = 50
         self.happiness = 50
         self.energy = 50
@@ -153,28 +610,80 @@ class Pet:
         self.last_fed = None
         self.last_played = None
         self.personality_traits = self._initialize_personality()
-        self.memory = PetMemory()
+        self.memory = PetMemory(memory_capacity, columnar=columnar_memory)
         self.behavioral_adaptations = {}
-        self.environmental_sensitivity = random.uniform(0.5, 1.5)
+        self.environmental_sensitivity = self.rng.uniform(0.5, 1.5)
         self.mood = "neutral"
         self.evolution_stage = "baby"
         self.evolution_points = 0
-        self.current_entropy_seed = EnvironmentSensor.get_entropy_seed()
-        self.interaction_frequency_history = []
-        self.favorite_activities = {}
-        self.preferred_foods = {}
+        self._frequency_history = []
+        self._raw_frequency_history = None
+        self._activity_preferences = PreferenceTable("enjoyment_total", "times_played")
+        self._food_preferences = PreferenceTable("satisfaction_total", "times_eaten")
         self.circadian_preferences = self._initialize_circadian_rhythm()
         self.seasonal_adaptations = {}
+        self.change_version = 0
+        self.journal = None
+        self.journal_version = 0
+        self._journal_marker = None
+    @property
+    def preferred_foods(self):
+        return self._food_preferences.entries
+    @preferred_foods.setter
+    def preferred_foods(self, entries):
+        self._food_preferences = PreferenceTable("satisfaction_total", "times_eaten", entries)
+    @property
+    def favorite_activities(self):
+        return self._activity_preferences.entries
+    @favorite_activities.setter
+    def favorite_activities(self, entries):
+        self._activity_preferences = PreferenceTable("enjoyment_total", "times_played", entries)
+    def food_preference_ranking(self):
+        return self._food_preferences.ranked()
+    def activity_preference_ranking(self):
+        return self._activity_preferences.ranked()
+    @property
+    def interaction_frequency_history(self):
+        if self._raw_frequency_history is not None:
+            raw, self._raw_frequency_history = self._raw_frequency_history, None
+            self._frequency_history = [
+                {"date": parse_date(entry["date"]), "interactions": entry["interactions"]} for entry in raw
+            ]
+        return self._frequency_history
+    @interaction_frequency_history.setter
+    def interaction_frequency_history(self, history):
+        self._raw_frequency_history = None
+        self._frequency_history = history
+    def _last_frequency_date(self):
+        if self._raw_frequency_history is not None:
+            return parse_date(self._raw_frequency_history[-1]["date"]) if self._raw_frequency_history else None
+        return self._frequency_history[-1]["date"] if self._frequency_history else None
+    def _frequency_marker(self):
+        if self._raw_frequency_history is not None:
+            return len(self._raw_frequency_history), self._raw_frequency_history[-1:]
+        return len(self._frequency_history), self._frequency_history[-1:]
+    def _serialized_frequency_history(self, epoch=False):
+        if self._raw_frequency_history is not None:
+            return self._raw_frequency_history
+        return [
+            {"date": format_date(entry["date"], epoch), "interactions": entry["interactions"]}
+            for entry in self._frequency_history
+        ]
+    @property
+    def state_version(self):
+        return self.change_version + sum(trait.change_version for trait in self.personality_traits.values())
+    def _mark_dirty(self):
+        self.change_version += 1
     def _initialize_personality(self):
         base_traits = {
-            "curiosity": random.randint(30, 70),
-            "loyalty": random.randint(40, 80),
-            "mischief": random.randint(20, 60),
-            "independence": random.randint(25, 75),
-            "sociability": random.randint(35, 85),
-            "intelligence": random.randint(30, 70),
-            "playfulness": random.randint(40, 90),
-            "calmness": random.randint(20, 80)
+            "curiosity": self.rng.randint(30, 70),
+            "loyalty": self.rng.randint(40, 80),
+            "mischief": self.rng.randint(20, 60),
+            "independence": self.rng.randint(25, 75),
+            "sociability": self.rng.randint(35, 85),
+            "intelligence": self.rng.randint(30, 70),
+            "playfulness": self.rng.randint(40, 90),
+            "calmness": self.rng.randint(20, 80)
         }
         traits = {}
         for name, strength in base_traits.items():
@@ -182,13 +691,13 @@ class Pet:
         return traits
     def _initialize_circadian_rhythm(self):
         return {
-            "morning_energy": random.uniform(0.8, 1.2),
-            "afternoon_playfulness": random.uniform(0.9, 1.3),
-            "evening_sociability": random.uniform(0.7, 1.1),
-            "night_restfulness": random.uniform(1.0, 1.5)
+            "morning_energy": self.rng.uniform(0.8, 1.2),
+            "afternoon_playfulness": self.rng.uniform(0.9, 1.3),
+            "evening_sociability": self.rng.uniform(0.7, 1.1),
+            "night_restfulness": self.rng.uniform(1.0, 1.5)
         }
     def get_age(self):
-        delta = datetime.now() - self.birth_time
+        delta = EnvironmentSensor.now() - self.birth_time
         days = delta.days
         hours = delta.seconds // 3600
         if days == 0:
@@ -198,6 +707,7 @@ class Pet:
         else:
             return f"{days} days old"
     def calculate_mood(self):
+        now = EnvironmentSensor.now()
         base_score = (
             self.happiness * 0.4 +
             self.health * 0.3 +
@@ -205,50 +715,32 @@ class Pet:
             (100 - self.hunger) * 0.1
         )
         personality_modifier = 1.0
-        if hasattr(self, 'personality_traits'):
-            if self.personality_traits.get("calmness"):
-                calmness = self.personality_traits["calmness"].strength / 100
-                personality_modifier += (calmness - 0.5) * 0.2
-            if self.personality_traits.get("sociability"):
-                sociability = self.personality_traits["sociability"].strength / 100
-                hours_since_interaction = (datetime.now() - self.last_interaction).total_seconds() / 3600
-                if hours_since_interaction > 2:
-                    personality_modifier -= sociability * 0.1
+        if self.personality_traits.get("calmness"):
+            calmness = self.personality_traits["calmness"].strength / 100
+            personality_modifier += (calmness - 0.5) * 0.2
+        if self.personality_traits.get("sociability"):
+            sociability = self.personality_traits["sociability"].strength / 100
+            hours_since_interaction = (now - self.last_interaction).total_seconds() / 3600
+            if hours_since_interaction > 2:
+                personality_modifier -= sociability * 0.1
         env_modifier = 1.0
-        if hasattr(self, 'environmental_sensitivity'):
-            time_mod = EnvironmentSensor.get_time_of_day_modifier()
-            seasonal_mod = EnvironmentSensor.get_seasonal_modifier()
-            env_modifier *= time_mod.get("happiness", 1.0) * self.environmental_sensitivity * 0.3
-            env_modifier *= seasonal_mod.get("happiness", 1.0) * self.environmental_sensitivity * 0.2
-            env_modifier = max(0.5, min(1.5, env_modifier))
+        environment = EnvironmentSensor.snapshot(now)
+        time_mod = environment.time_modifier
+        seasonal_mod = environment.seasonal_modifier
+        env_modifier *= time_mod.get("happiness", 1.0) * self.environmental_sensitivity * 0.3
+        env_modifier *= seasonal_mod.get("happiness", 1.0) * self.environmental_sensitivity * 0.2
+        env_modifier = max(0.5, min(1.5, env_modifier))
         final_score = base_score * personality_modifier * env_modifier
-        if hasattr(self, 'current_entropy_seed'):
-            random.seed(self.current_entropy_seed + int(time.time() // 600))  
-            entropy_variation = random.uniform(-5, 5)
-            final_score += entropy_variation
-        if final_score >= 90:
-            moods = ["blissful", "euphoric", "radiant", "transcendent"]
-        elif final_score >= 80:
-            moods = ["ecstatic", "joyful", "elated", "exuberant"]
-        elif final_score >= 70:
-            moods = ["happy", "cheerful", "upbeat", "content"]
-        elif final_score >= 60:
-            moods = ["pleased", "satisfied", "positive", "good"]
-        elif final_score >= 50:
-            moods = ["neutral", "calm", "steady", "balanced"]
-        elif final_score >= 40:
-            moods = ["subdued", "quiet", "pensive", "reflective"]
-        elif final_score >= 30:
-            moods = ["sad", "melancholy", "downcast", "blue"]
-        elif final_score >= 20:
-            moods = ["distressed", "troubled", "upset", "worried"]
-        elif final_score >= 10:
-            moods = ["miserable", "dejected", "despondent", "anguished"]
-        else:
-            moods = ["devastated", "broken", "hopeless", "despairing"]
-        random.seed(int(time.time() // 300) + hash(self.name))
-        self.mood = random.choice(moods)
+        variation_key = self.current_entropy_seed + int(now.timestamp() // 600)
+        entropy_variation = (PetRandom.mix(variation_key) >> 11) * (10.0 / (1 << 53)) - 5
+        final_score += entropy_variation
+        for threshold, moods in MOOD_TABLE:
+            if final_score >= threshold:
+                break
+        mood_key = int(now.timestamp() // 300) + zlib.crc32(self.name.encode())
+        self.mood = moods[PetRandom.mix(mood_key) % len(moods)]
         return self.mood
+    @journaled("feed")
     def feed(self, food_type="kibble"):
         if self.hunger <= 10:
             return {
@@ -256,47 +748,39 @@ class Pet:
                 "message": f"{self.name} is too full to eat right now!",
                 "response": self._get_personality_based_response("too_full", food_type)
             }
-        base_effects = {
-            "kibble": {"hunger": -20, "happiness": 5, "msg": "crunches steadily"},
-            "treat": {"hunger": -10, "happiness": 15, "msg": "devours excitedly"},
-            "vegetable": {"hunger": -15, "happiness": 2, "health": 5, "msg": "nibbles carefully"},
-            "meat": {"hunger": -25, "happiness": 10, "energy": 5, "msg": "tears into hungrily"},
-            "fish": {"hunger": -20, "happiness": 12, "health": 3, "msg": "savors delicately"}
-        }
-        effect = base_effects.get(food_type, base_effects["kibble"])
-        if hasattr(self, 'personality_traits'):
-            if food_type != "kibble" and self.personality_traits.get("curiosity"):
-                curiosity_bonus = (self.personality_traits["curiosity"].strength / 100) * 5
-                effect["happiness"] += curiosity_bonus
-            if self.personality_traits.get("intelligence"):
-                self._update_food_preference(food_type, effect.get("happiness", 0))
-        env_modifiers = EnvironmentSensor.get_time_of_day_modifier()
-        seasonal_modifiers = EnvironmentSensor.get_seasonal_modifier()
-        hunger_change = effect["hunger"]
-        happiness_change = effect["happiness"] * env_modifiers.get("happiness", 1.0)
+        food = ACTION_REGISTRY.food(food_type)
+        happiness = feeding_happiness(food, food_type, self.personality_traits)
+        if self.personality_traits.get("intelligence"):
+            self._update_food_preference(food_type, happiness)
+        environment = EnvironmentSensor.snapshot()
+        env_modifiers = environment.time_modifier
+        seasonal_modifiers = environment.seasonal_modifier
+        hunger_change = food.hunger
+        happiness_change = happiness * env_modifiers.get("happiness", 1.0)
         self.hunger = max(0, self.hunger + hunger_change)
         self.happiness = min(100, self.happiness + happiness_change)
-        if "health" in effect:
-            health_change = effect["health"] * seasonal_modifiers.get("health", 1.0)
+        if food.health:
+            health_change = food.health * seasonal_modifiers.get("health", 1.0)
             self.health = min(100, self.health + health_change)
-        if "energy" in effect:
-            energy_change = effect["energy"] * env_modifiers.get("energy", 1.0)
+        if food.energy:
+            energy_change = food.energy * env_modifiers.get("energy", 1.0)
             self.energy = min(100, self.energy + energy_change)
-        if hasattr(self, 'memory'):
-            emotional_impact = happiness_change / 10  
-            self.memory.add_experience("feeding", {
-                "food_type": food_type,
-                "satisfaction": happiness_change,
-                "hunger_before": self.hunger - hunger_change
-            }, emotional_impact)
-        self.last_fed = datetime.now()
+        emotional_impact = happiness_change / 10  
+        self.memory.add_experience("feeding", {
+            "food_type": food_type,
+            "satisfaction": happiness_change,
+            "hunger_before": self.hunger - hunger_change
+        }, emotional_impact)
+        self.last_fed = EnvironmentSensor.now()
         self._update_interaction()
         self._adapt_personality_from_feeding(food_type, happiness_change)
+        self._mark_dirty()
         return {
             "success": True,
-            "message": f"{self.name} {effect['msg']}!",
+            "message": f"{self.name} {food.message}!",
             "response": self._get_advanced_response("feeding", food_type, happiness_change)
         }
+    @journaled("play")
     def play(self, activity="fetch"):
         if self.energy <= 10:
             return {
@@ -310,53 +794,32 @@ class Pet:
                 "message": f"{self.name} is too hungry to play. Feed them first!",
                 "response": self._get_personality_based_response("too_hungry", activity)
             }
-        base_activities = {
-            "fetch": {"happiness": 15, "energy": -20, "msg": "bounds joyfully"},
-            "tug": {"happiness": 12, "energy": -15, "msg": "tugs determinedly"},
-            "puzzle": {"happiness": 10, "energy": -10, "experience": 3, "msg": "concentrates intently"},
-            "cuddle": {"happiness": 20, "energy": -5, "msg": "snuggles warmly"},
-            "training": {"happiness": 8, "energy": -25, "experience": 5, "msg": "focuses eagerly"}
-        }
-        effect = base_activities.get(activity, base_activities["fetch"])
-        if hasattr(self, 'personality_traits'):
-            if self.personality_traits.get("playfulness"):
-                playfulness_bonus = (self.personality_traits["playfulness"].strength / 100) * 5
-                effect["happiness"] += playfulness_bonus
-            if activity in ["puzzle", "training"] and self.personality_traits.get("intelligence"):
-                intelligence_bonus = (self.personality_traits["intelligence"].strength / 100) * 3
-                effect["experience"] = effect.get("experience", 0) + intelligence_bonus
-            if self.personality_traits.get("independence"):
-                independence = self.personality_traits["independence"].strength / 100
-                if activity == "cuddle":
-                    effect["happiness"] *= (1 - independence * 0.3)
-                elif activity in ["fetch", "puzzle"]:
-                    effect["happiness"] *= (1 + independence * 0.2)
+        effect = ACTION_REGISTRY.activity(activity)
         env_modifiers = EnvironmentSensor.get_time_of_day_modifier()
         preferred_activity = env_modifiers.get("activity_preference", "fetch")
-        if activity == preferred_activity:
-            effect["happiness"] *= 1.2  
-        happiness_change = effect["happiness"]
-        energy_change = effect["energy"]
+        happiness_change, experience_gain = play_effect(effect, activity, self.personality_traits, preferred_activity)
+        energy_change = effect.energy
         self.happiness = min(100, self.happiness + happiness_change)
         self.energy = max(0, self.energy + energy_change)
-        if "experience" in effect:
-            self.experience += effect["experience"]
-        if hasattr(self, 'memory'):
-            emotional_impact = happiness_change / 10
-            self.memory.add_experience("playing", {
-                "activity": activity,
-                "enjoyment": happiness_change,
-                "energy_before": self.energy - energy_change
-            }, emotional_impact)
+        if experience_gain:
+            self.experience += experience_gain
+        emotional_impact = happiness_change / 10
+        self.memory.add_experience("playing", {
+            "activity": activity,
+            "enjoyment": happiness_change,
+            "energy_before": self.energy - energy_change
+        }, emotional_impact)
         self._update_activity_preference(activity, happiness_change)
-        self.last_played = datetime.now()
+        self.last_played = EnvironmentSensor.now()
         self._update_interaction()
         self._adapt_personality_from_playing(activity, happiness_change)
+        self._mark_dirty()
         return {
             "success": True,
-            "message": f"{self.name} {effect['msg']}!",
+            "message": f"{self.name} {effect.message}!",
             "response": self._get_advanced_response("playing", activity, happiness_change)
         }
+    @journaled("rest")
     def rest(self):
         if self.energy >= 90:
             return {
@@ -364,10 +827,11 @@ class Pet:
                 "message": f"{self.name} is too energetic to rest right now!",
                 "response": "Bounces around excitedly"
             }
-        energy_gain = random.randint(20, 35)
+        energy_gain = self.rng.randint(20, 35)
         self.energy = min(100, self.energy + energy_gain)
         self.hunger = min(100, self.hunger + 5)  
         self._update_interaction()
+        self._mark_dirty()
         return {
             "success": True,
             "message": f"{self.name} takes a peaceful nap and feels refreshed!",
@@ -382,7 +846,7 @@ class Pet:
             "age": self.get_age(),
             "level": self.level,
             "mood": mood,
-            "evolution_stage": getattr(self, 'evolution_stage', 'baby'),
+            "evolution_stage": self.evolution_stage,
             "stats": {
                 "hunger": self.hunger,
                 "happiness": self.happiness,
@@ -396,109 +860,102 @@ class Pet:
             "last_fed": self._format_time(self.last_fed) if self.last_fed else "Never",
             "last_played": self._format_time(self.last_played) if self.last_played else "Never"
         }
-        if hasattr(self, 'personality_traits'):
-            status["personality"] = self.get_personality_summary()
-        if hasattr(self, 'memory'):
-            status["behavioral_insights"] = self.get_behavioral_insights()
-            status["total_memories"] = len(self.memory.experiences)
-        if hasattr(self, 'environmental_sensitivity'):
-            status["environmental_sensitivity"] = round(self.environmental_sensitivity, 2)
-        env_context = EnvironmentSensor.get_time_of_day_modifier()
-        status["current_time_preference"] = env_context.get("activity_preference", "none")
-        season_context = EnvironmentSensor.get_seasonal_modifier()
-        current_season = EnvironmentSensor._get_season(datetime.now().month)
-        status["current_season"] = current_season
+        status["personality"] = self.get_personality_summary()
+        status["behavioral_insights"] = self.get_behavioral_insights()
+        status["total_memories"] = self.memory.experience_count
+        status["environmental_sensitivity"] = round(self.environmental_sensitivity, 2)
+        environment = EnvironmentSensor.snapshot()
+        status["current_time_preference"] = environment.time_modifier.get("activity_preference", "none")
+        status["current_season"] = environment.season
         return status
+    @journaled("passive")
     def update_passive_stats(self):
-        now = datetime.now()
+        now = EnvironmentSensor.now()
+        idle_start = max(self.last_passive_update, self.last_interaction)
+        if now <= idle_start:
+            return
+        previous_hours = (idle_start - self.last_interaction).total_seconds() / 3600
         hours_passed = (now - self.last_interaction).total_seconds() / 3600
-        if hours_passed > 0:
-            hunger_increase = min(hours_passed * 2, 20)
-            env_modifiers = EnvironmentSensor.get_time_of_day_modifier()
-            seasonal_modifiers = EnvironmentSensor.get_seasonal_modifier()
-            if hasattr(self, 'personality_traits'):
-                independence = self.personality_traits.get("independence", PersonalityTrait("independence", 50))
-                if hours_passed > 2:
-                    isolation_resistance = independence.strength / 100
-                    happiness_decrease = min((hours_passed - 2) * 1.5 * (1 - isolation_resistance * 0.5), 15)
-                    self.happiness = max(0, self.happiness - happiness_decrease)
-                sociability = self.personality_traits.get("sociability", PersonalityTrait("sociability", 50))
-                if hours_passed > 4:
-                    social_need = sociability.strength / 100
-                    loneliness_penalty = social_need * 5
-                    self.happiness = max(0, self.happiness - loneliness_penalty)
-                calmness = self.personality_traits.get("calmness", PersonalityTrait("calmness", 50))
-                stress_resistance = calmness.strength / 100
-                if self.hunger > 80 or self.happiness < 20:
-                    health_decrease = min(hours_passed * 0.3 * (1 - stress_resistance * 0.3), 5)
-                    self.health = max(0, self.health - health_decrease)
-            else:
-                if hours_passed > 2:
-                    happiness_decrease = min((hours_passed - 2) * 1.5, 15)
-                    self.happiness = max(0, self.happiness - happiness_decrease)
-                if self.hunger > 80 or self.happiness < 20:
-                    health_decrease = min(hours_passed * 0.3, 5)
-                    self.health = max(0, self.health - health_decrease)
-            if hasattr(self, 'environmental_sensitivity'):
-                env_effect = self.environmental_sensitivity
-                energy_modifier = env_modifiers.get("energy", 1.0)
-                if self.energy < 80:
-                    energy_increase = min(hours_passed * 0.5 * energy_modifier * env_effect, 10)
-                    self.energy = min(100, self.energy + energy_increase)
-                health_modifier = seasonal_modifiers.get("health", 1.0)
-                if health_modifier != 1.0:
-                    health_change = (health_modifier - 1.0) * 2 * env_effect
-                    self.health = max(0, min(100, self.health + health_change))
-            self.hunger = min(100, self.hunger + hunger_increase)
-            if hasattr(self, 'current_entropy_seed'):
-                if int(hours_passed) > 0:
-                    self.current_entropy_seed = EnvironmentSensor.get_entropy_seed()
-            if hasattr(self, 'interaction_frequency_history'):
-                current_day = now.date()
-                if not self.interaction_frequency_history or self.interaction_frequency_history[-1]["date"] != current_day:
-                    self.interaction_frequency_history.append({
-                        "date": current_day,
-                        "interactions": self.interactions_today
-                    })
-                    self.interactions_today = 0  
-                if len(self.interaction_frequency_history) > 30:
-                    self.interaction_frequency_history = self.interaction_frequency_history[-30:]
-            if hasattr(self, 'evolve_based_on_experience'):
-                self.evolve_based_on_experience()
+        self._advance_passive_state(previous_hours, hours_passed)
+        self.last_passive_update = now
+        if int(hours_passed) > int(previous_hours):
+            self.current_entropy_seed = self.rng.getrandbits(32)
+        current_day = now.date()
+        if self._last_frequency_date() != current_day:
+            self.interaction_frequency_history.append({
+                "date": current_day,
+                "interactions": self.interactions_today
+            })
+            self.interactions_today = 0  
+            if len(self.interaction_frequency_history) > 30:
+                self.interaction_frequency_history = self.interaction_frequency_history[-30:]
+        self.evolve_based_on_experience()
+        self._mark_dirty()
+    def _passive_resistances(self):
+        traits = self.personality_traits
+        return tuple(
+            (traits[name].strength if name in traits else 50) / 100
+            for name in ("independence", "sociability", "calmness")
+        )
+    def _passive_horizon_hours(self):
+        return max(24.0, 34.0 / max(self.environmental_sensitivity, 0.01))
+    def _advance_passive_state(self, start_hours, end_hours):
+        resistances = self._passive_resistances()
+        end_hours = min(end_hours, self._passive_horizon_hours())
+        if start_hours == 0:
+            seasonal_modifiers = EnvironmentSensor.snapshot(self.last_interaction).seasonal_modifier
+            health_modifier = seasonal_modifiers.get("health", 1.0)
+            if health_modifier != 1.0:
+                health_change = (health_modifier - 1.0) * 2 * self.environmental_sensitivity
+                self.health = max(0, min(100, self.health + health_change))
+        hours = start_hours
+        while hours < end_hours:
+            step_end = min(end_hours, hours + self.PASSIVE_STEP_HOURS)
+            environment = EnvironmentSensor.snapshot(self.last_interaction + timedelta(hours=hours))
+            self._apply_passive_step(hours, step_end, environment.time_modifier, resistances)
+            hours = step_end
+    def _apply_passive_step(self, start, end, env_modifiers, resistances):
+        isolation_resistance, social_need, stress_resistance = resistances
+        happiness_rate = 1.5 * (1 - isolation_resistance * 0.5)
+        happiness_decrease = (
+            min(max(0, end - 2) * happiness_rate, 15) - min(max(0, start - 2) * happiness_rate, 15)
+        )
+        if happiness_decrease > 0:
+            self.happiness = max(0, self.happiness - happiness_decrease)
+        if start <= 4 < end and social_need:
+            self.happiness = max(0, self.happiness - social_need * 5)
+        if self.hunger > 80 or self.happiness < 20:
+            health_rate = 0.3 * (1 - stress_resistance * 0.3)
+            health_decrease = min(end * health_rate, 5) - min(start * health_rate, 5)
+            self.health = max(0, self.health - health_decrease)
+        if self.energy < 80:
+            energy_rate = 0.5 * env_modifiers.get("energy", 1.0) * self.environmental_sensitivity
+            energy_increase = min(end * energy_rate, 10) - min(start * energy_rate, 10)
+            self.energy = min(100, self.energy + energy_increase)
+        hunger_increase = min(end * 2, 20) - min(start * 2, 20)
+        self.hunger = min(100, self.hunger + hunger_increase)
+    @journaled("level_up")
     def level_up_check(self):
         required_exp = self.level * 100
         if self.experience >= required_exp:
             self.level += 1
             self.experience -= required_exp
+            self._mark_dirty()
             return True
         return False
     def _update_interaction(self):
-        self.last_interaction = datetime.now()
+        self.last_interaction = EnvironmentSensor.now()
         self.interactions_today += 1
         self.total_interactions += 1
         self.experience += 5
     def _get_food_response(self, food_type):
-        responses = {
-            "kibble": ["*crunch crunch*", "*nom nom*", "*munch munch*"],
-            "treat": ["*excited wagging*", "*happy yips*", "*bounces with joy*"],
-            "vegetable": ["*chews slowly*", "*sighs*", "*eats reluctantly*"],
-            "meat": ["*growls happily*", "*devours quickly*", "*licks lips*"],
-            "fish": ["*purrs*", "*savors taste*", "*meows appreciation*"]
-        }
-        return random.choice(responses.get(food_type, responses["kibble"]))
+        return self.rng.choice(ACTION_REGISTRY.food(food_type).responses)
     def _get_play_response(self, activity):
-        responses = {
-            "fetch": ["*runs excitedly*", "*brings back toy*", "*pants happily*"],
-            "tug": ["*growls playfully*", "*pulls hard*", "*shakes toy*"],
-            "puzzle": ["*tilts head*", "*paws at puzzle*", "*looks proud*"],
-            "cuddle": ["*purrs softly*", "*nuzzles close*", "*relaxes*"],
-            "training": ["*sits attentively*", "*performs trick*", "*wags tail*"]
-        }
-        return random.choice(responses.get(activity, responses["fetch"]))
+        return self.rng.choice(ACTION_REGISTRY.activity(activity).responses)
     def _time_since_last_interaction(self):
         if not self.last_interaction:
             return "Unknown"
-        delta = datetime.now() - self.last_interaction
+        delta = EnvironmentSensor.now() - self.last_interaction
         seconds = int(delta.total_seconds())
         if seconds < 60:
             return f"{seconds} seconds ago"
@@ -515,12 +972,16 @@ class Pet:
         if not time_obj:
             return "Never"
         return time_obj.strftime("%Y-%m-%d %H:%M:%S")
-    def to_dict(self):
+    def to_dict(self, epoch_timestamps=False):
+        epoch = epoch_timestamps
         data = {
+            "schema_version": self.SCHEMA_VERSION,
+            "pet_id": self.pet_id,
             "name": self.name,
             "species": self.species,
-            "birth_time": self.birth_time.isoformat(),
-            "last_interaction": self.last_interaction.isoformat(),
+            "birth_time": format_timestamp(self.birth_time, epoch),
+            "last_interaction": format_timestamp(self.last_interaction, epoch),
+            "last_passive_update": format_timestamp(self.last_passive_update, epoch),
             "hunger": self.hunger,
             "happiness": self.happiness,
             "energy": self.energy,
@@ -529,206 +990,207 @@ class Pet:
             "experience": self.experience,
             "interactions_today": self.interactions_today,
             "total_interactions": self.total_interactions,
-            "last_fed": self.last_fed.isoformat() if self.last_fed else None,
-            "last_played": self.last_played.isoformat() if self.last_played else None,
+            "last_fed": format_timestamp(self.last_fed, epoch),
+            "last_played": format_timestamp(self.last_played, epoch),
             "mood": self.mood,
             "evolution_stage": self.evolution_stage,
-            "evolution_points": getattr(self, 'evolution_points', 0)
+            "evolution_points": self.evolution_points
         }
-        if hasattr(self, 'personality_traits'):
-            data["personality_traits"] = {}
-            for name, trait in self.personality_traits.items():
-                data["personality_traits"][name] = {
-                    "strength": trait.strength,
-                    "last_changed": trait.last_changed.isoformat(),
-                    "development_history": [
-                        {
-                            "timestamp": entry["timestamp"].isoformat(),
-                            "old_value": entry["old_value"],
-                            "new_value": entry["new_value"],
-                            "change": entry["change"],
-                            "reason": entry["reason"]
-                        } for entry in trait.development_history[-10:]  
-                    ]
-                }
-        if hasattr(self, 'memory'):
-            data["memory"] = {
-                "experiences": [
-                    {
-                        "timestamp": exp["timestamp"].isoformat(),
-                        "type": exp["type"],
-                        "details": exp["details"],
-                        "emotional_impact": exp["emotional_impact"],
-                        "context": exp["context"]
-                    } for exp in self.memory.experiences[-50:]  
-                ],
-                "behavior_patterns": self.memory.behavior_patterns,
-                "preferences": self.memory.preferences,
-                "time_patterns": self.memory.time_patterns
+        data["personality_traits"] = {}
+        for name, trait in self.personality_traits.items():
+            data["personality_traits"][name] = {
+                "strength": trait.strength,
+                "last_changed": format_timestamp(trait.last_changed, epoch),
+                "development_history": trait.serialized_history(epoch)
             }
-        if hasattr(self, 'environmental_sensitivity'):
-            data["environmental_sensitivity"] = self.environmental_sensitivity
-        if hasattr(self, 'interaction_frequency_history'):
-            data["interaction_frequency_history"] = [
-                {
-                    "date": entry["date"].isoformat(),
-                    "interactions": entry["interactions"]
-                } for entry in self.interaction_frequency_history
-            ]
-        if hasattr(self, 'favorite_activities'):
-            data["favorite_activities"] = self.favorite_activities
-        if hasattr(self, 'preferred_foods'):
-            data["preferred_foods"] = self.preferred_foods
-        if hasattr(self, 'circadian_preferences'):
-            data["circadian_preferences"] = self.circadian_preferences
-        if hasattr(self, 'current_entropy_seed'):
-            data["current_entropy_seed"] = self.current_entropy_seed
+        data["memory"] = {
+            "max_memories": self.memory.max_memories,
+            "columnar": self.memory.columnar,
+            "experiences": self.memory.serialized_experiences(epoch),
+            "behavior_patterns": self.memory.behavior_patterns,
+            "preferences": self.memory.preferences,
+            "time_patterns": self.memory.time_patterns
+        }
+        data["environmental_sensitivity"] = self.environmental_sensitivity
+        data["interaction_frequency_history"] = self._serialized_frequency_history(epoch)
+        data["favorite_activities"] = self.favorite_activities
+        data["preferred_foods"] = self.preferred_foods
+        data["circadian_preferences"] = self.circadian_preferences
+        data["current_entropy_seed"] = self.current_entropy_seed
+        data["rng_state"] = self.rng.getstate()
         return data
     @classmethod
     def from_dict(cls, data):
-        pet = cls(data["name"], data.get("species", "Generic"))
-        pet.birth_time = datetime.fromisoformat(data["birth_time"])
-        pet.last_interaction = datetime.fromisoformat(data["last_interaction"])
+        pet = cls(data["name"], data["species"], seed=data.get("current_entropy_seed"))
+        pet.pet_id = data["pet_id"]
+        pet.birth_time = parse_timestamp(data["birth_time"])
+        pet.last_interaction = parse_timestamp(data["last_interaction"])
+        pet.last_passive_update = parse_timestamp(data["last_passive_update"])
         pet.hunger = data["hunger"]
         pet.happiness = data["happiness"]
         pet.energy = data["energy"]
         pet.health = data["health"]
         pet.level = data["level"]
         pet.experience = data["experience"]
-        pet.interactions_today = data.get("interactions_today", 0)
-        pet.total_interactions = data.get("total_interactions", 0)
-        pet.last_fed = datetime.fromisoformat(data["last_fed"]) if data.get("last_fed") else None
-        pet.last_played = datetime.fromisoformat(data["last_played"]) if data.get("last_played") else None
-        pet.mood = data.get("mood", "neutral")
-        pet.evolution_stage = data.get("evolution_stage", "baby")
-        pet.evolution_points = data.get("evolution_points", 0)
+        pet.interactions_today = data["interactions_today"]
+        pet.total_interactions = data["total_interactions"]
+        pet.last_fed = parse_timestamp(data["last_fed"])
+        pet.last_played = parse_timestamp(data["last_played"])
+        pet.mood = data["mood"]
+        pet.evolution_stage = data["evolution_stage"]
+        pet.evolution_points = data["evolution_points"]
         if "personality_traits" in data:
             pet.personality_traits = {}
             for name, trait_data in data["personality_traits"].items():
                 trait = PersonalityTrait(name, trait_data["strength"])
-                trait.last_changed = datetime.fromisoformat(trait_data["last_changed"])
-                trait.development_history = []
-                for entry in trait_data.get("development_history", []):
-                    trait.development_history.append({
-                        "timestamp": datetime.fromisoformat(entry["timestamp"]),
-                        "old_value": entry["old_value"],
-                        "new_value": entry["new_value"],
-                        "change": entry["change"],
-                        "reason": entry["reason"]
-                    })
+                trait.last_changed = parse_timestamp(trait_data["last_changed"])
+                trait.load_raw_history(trait_data["development_history"])
                 pet.personality_traits[name] = trait
         if "memory" in data:
-            pet.memory = PetMemory()
             memory_data = data["memory"]
-            for exp_data in memory_data.get("experiences", []):
-                experience = {
-                    "timestamp": datetime.fromisoformat(exp_data["timestamp"]),
-                    "type": exp_data["type"],
-                    "details": exp_data["details"],
-                    "emotional_impact": exp_data["emotional_impact"],
-                    "context": exp_data["context"]
-                }
-                pet.memory.experiences.append(experience)
-            pet.memory.behavior_patterns = memory_data.get("behavior_patterns", {})
-            pet.memory.preferences = memory_data.get("preferences", {})
-            pet.memory.time_patterns = memory_data.get("time_patterns", {})
-        pet.environmental_sensitivity = data.get("environmental_sensitivity", random.uniform(0.5, 1.5))
+            pet.memory = PetMemory(memory_data["max_memories"], columnar=memory_data["columnar"])
+            pet.memory.load_raw_experiences(memory_data["experiences"])
+            pet.memory.behavior_patterns = PetMemory.migrate_behavior_patterns(
+                memory_data["behavior_patterns"], pet.memory.max_context_samples
+            )
+            pet.memory.preferences = memory_data["preferences"]
+            pet.memory.load_time_patterns(memory_data["time_patterns"])
+        pet.environmental_sensitivity = data.get("environmental_sensitivity", pet.environmental_sensitivity)
         if "interaction_frequency_history" in data:
-            pet.interaction_frequency_history = []
-            for entry in data["interaction_frequency_history"]:
-                pet.interaction_frequency_history.append({
-                    "date": datetime.fromisoformat(entry["date"]).date(),
-                    "interactions": entry["interactions"]
-                })
-        pet.favorite_activities = data.get("favorite_activities", {})
-        pet.preferred_foods = data.get("preferred_foods", {})
-        pet.circadian_preferences = data.get("circadian_preferences", pet._initialize_circadian_rhythm())
-        pet.current_entropy_seed = data.get("current_entropy_seed", EnvironmentSensor.get_entropy_seed())
+            pet._raw_frequency_history = list(data["interaction_frequency_history"])
+        pet.favorite_activities = data["favorite_activities"]
+        pet.preferred_foods = data["preferred_foods"]
+        pet.circadian_preferences = data.get("circadian_preferences", pet.circadian_preferences)
+        if data["rng_state"] is not None:
+            pet.rng.setstate(data["rng_state"])
         return pet
+    def enable_journal(self):
+        self.journal = []
+        self.journal_version = self.state_version
+    def _journal_snapshot_marker(self):
+        return {
+            "state_version": self.state_version,
+            "rng_state": self.rng.getstate(),
+            "memory_sequence": self.memory.sequence,
+            "trait_versions": {name: trait.change_version for name, trait in self.personality_traits.items()},
+            "frequency": self._frequency_marker()
+        }
+    def _core_state(self):
+        return {
+            "last_interaction": format_timestamp(self.last_interaction),
+            "last_passive_update": format_timestamp(self.last_passive_update),
+            "hunger": self.hunger,
+            "happiness": self.happiness,
+            "energy": self.energy,
+            "health": self.health,
+            "level": self.level,
+            "experience": self.experience,
+            "interactions_today": self.interactions_today,
+            "total_interactions": self.total_interactions,
+            "last_fed": format_timestamp(self.last_fed),
+            "last_played": format_timestamp(self.last_played),
+            "mood": self.mood,
+            "evolution_stage": self.evolution_stage,
+            "evolution_points": self.evolution_points,
+            "current_entropy_seed": self.current_entropy_seed,
+            "rng_state": self.rng.getstate()
+        }
+    def _record_journal_event(self, op, marker):
+        if self.state_version == marker["state_version"] and self.rng.getstate() == marker["rng_state"]:
+            return
+        event = {"op": op, "at": EnvironmentSensor.now().isoformat(), "core": self._core_state()}
+        new_experiences = min(self.memory.sequence - marker["memory_sequence"], self.memory.experience_count)
+        if new_experiences:
+            event["experiences"] = [
+                PetMemory.serialize_experience(exp) for exp in self.memory.experiences[-new_experiences:]
+            ]
+        traits = {}
+        for name, trait in self.personality_traits.items():
+            if trait.change_version != marker["trait_versions"].get(name):
+                added = min(trait.change_version - marker["trait_versions"].get(name, 0), len(trait.development_history))
+                traits[name] = {
+                    "strength": trait.strength,
+                    "last_changed": trait.last_changed.isoformat(),
+                    "history": [
+                        PersonalityTrait.serialize_history_entry(entry) for entry in trait.development_history[-added:]
+                    ] if added > 0 else []
+                }
+        if traits:
+            event["traits"] = traits
+        if op == "feed":
+            event["preferred_foods"] = {food: dict(data) for food, data in self.preferred_foods.items()}
+        elif op == "play":
+            event["favorite_activities"] = {activity: dict(data) for activity, data in self.favorite_activities.items()}
+        if self._frequency_marker() != marker["frequency"]:
+            event["interaction_frequency_history"] = [
+                {"date": entry["date"].isoformat(), "interactions": entry["interactions"]}
+                for entry in self.interaction_frequency_history
+            ]
+        self.journal.append(event)
+        self.journal_version = self.state_version
+    def apply_journal_event(self, event):
+        core = event["core"]
+        for key in ("hunger", "happiness", "energy", "health", "level", "experience", "interactions_today",
+                    "total_interactions", "mood", "evolution_stage", "evolution_points", "current_entropy_seed"):
+            setattr(self, key, core[key])
+        if core.get("rng_state") is not None:
+            self.rng.setstate(core["rng_state"])
+        self.last_interaction = parse_timestamp(core["last_interaction"])
+        self.last_passive_update = parse_timestamp(core.get("last_passive_update")) or self.last_interaction
+        self.last_fed = parse_timestamp(core["last_fed"])
+        self.last_played = parse_timestamp(core["last_played"])
+        for exp_data in event.get("experiences", []):
+            self.memory.record_experience(PetMemory.deserialize_experience(exp_data))
+        for name, trait_data in event.get("traits", {}).items():
+            trait = self.personality_traits.setdefault(name, PersonalityTrait(name))
+            trait.strength = trait_data["strength"]
+            trait.last_changed = parse_timestamp(trait_data["last_changed"])
+            trait.development_history.extend(
+                PersonalityTrait.deserialize_history_entry(entry) for entry in trait_data["history"]
+            )
+        if "preferred_foods" in event:
+            self.preferred_foods = event["preferred_foods"]
+        if "favorite_activities" in event:
+            self.favorite_activities = event["favorite_activities"]
+        if "interaction_frequency_history" in event:
+            self.interaction_frequency_history = [
+                {"date": parse_date(entry["date"]), "interactions": entry["interactions"]}
+                for entry in event["interaction_frequency_history"]
+            ]
     def _update_food_preference(self, food_type, satisfaction):
-        if food_type not in self.preferred_foods:
-            self.preferred_foods[food_type] = {"satisfaction_total": 0, "times_eaten": 0}
-        self.preferred_foods[food_type]["satisfaction_total"] += satisfaction
-        self.preferred_foods[food_type]["times_eaten"] += 1
+        self._food_preferences.record(food_type, satisfaction)
     def _update_activity_preference(self, activity, enjoyment):
-        if activity not in self.favorite_activities:
-            self.favorite_activities[activity] = {"enjoyment_total": 0, "times_played": 0}
-        self.favorite_activities[activity]["enjoyment_total"] += enjoyment
-        self.favorite_activities[activity]["times_played"] += 1
+        self._activity_preferences.record(activity, enjoyment)
     def _adapt_personality_from_feeding(self, food_type, satisfaction):
-        if not hasattr(self, 'personality_traits'):
-            return
         if food_type != "kibble" and satisfaction > 10:
             self.personality_traits["curiosity"].modify(0.5, f"enjoyed {food_type}")
-        if hasattr(self, 'last_fed') and self.last_fed:
-            hours_since_last = (datetime.now() - self.last_fed).total_seconds() / 3600
+        if self.last_fed:
+            hours_since_last = (EnvironmentSensor.now() - self.last_fed).total_seconds() / 3600
             if hours_since_last < 6:  
                 self.personality_traits["loyalty"].modify(0.3, "regular feeding")
     def _adapt_personality_from_playing(self, activity, enjoyment):
-        if not hasattr(self, 'personality_traits'):
-            return
-        trait_mappings = {
-            "puzzle": ("intelligence", 0.4),
-            "training": ("intelligence", 0.6),
-            "fetch": ("playfulness", 0.3),
-            "tug": ("mischief", 0.2),
-            "cuddle": ("sociability", 0.4)
-        }
-        if activity in trait_mappings and enjoyment > 5:
-            trait, modifier = trait_mappings[activity]
-            self.personality_traits[trait].modify(modifier, f"enjoyed {activity}")
+        effect = ACTION_REGISTRY.activities.get(activity)
+        if effect is not None and effect.trait in self.personality_traits and enjoyment > 5:
+            self.personality_traits[effect.trait].modify(effect.trait_change, f"enjoyed {activity}")
     def _get_personality_based_response(self, situation, context=""):
-        if not hasattr(self, 'personality_traits'):
-            return "Looks at you meaningfully"
-        responses = {
-            "too_full": {
-                "high_mischief": ["Knocks over food bowl playfully", "Hides the food for later"],
-                "high_independence": ["Walks away with dignity", "Gives you a pointed look"],
-                "high_sociability": ["Nuzzles you apologetically", "Sits close but doesn't eat"],
-                "default": ["Pushes food away gently", "Looks satisfied"]
-            },
-            "too_tired": {
-                "high_playfulness": ["Tries to play but stumbles sleepily", "Wags tail weakly"],
-                "high_independence": ["Curls up independently", "Finds a quiet spot to rest"],
-                "high_sociability": ["Leans against you tiredly", "Falls asleep near you"],
-                "default": ["Yawns and lies down", "Stretches and settles"]
-            },
-            "too_hungry": {
-                "high_mischief": ["Steals attention from the activity", "Dramatically flops down"],
-                "high_intelligence": ["Points toward food bowl", "Brings you to food area"],
-                "high_sociability": ["Follows you around hopefully", "Makes pleading eyes"],
-                "default": ["Looks at empty food bowl", "Stomach rumbles audibly"]
-            }
-        }
-        situation_responses = responses.get(situation, {})
+        situation_responses = SITUATION_RESPONSES.get(situation, {})
         highest_trait = max(self.personality_traits.items(), 
                           key=lambda x: x[1].strength)
         trait_name, trait_obj = highest_trait
         response_key = f"high_{trait_name}" if trait_obj.strength > 70 else "default"
         if response_key in situation_responses:
-            return random.choice(situation_responses[response_key])
+            return self.rng.choice(situation_responses[response_key])
         else:
-            return random.choice(situation_responses.get("default", ["Reacts characteristically"]))
+            return self.rng.choice(situation_responses.get("default", ("Reacts characteristically",)))
     def _get_advanced_response(self, action_type, context, satisfaction):
-        if not hasattr(self, 'memory'):
-            return self._get_basic_response(action_type, context)
         is_favorite = False
         if action_type == "feeding" and context in self.preferred_foods:
-            avg_satisfaction = (self.preferred_foods[context]["satisfaction_total"] / 
-                              max(1, self.preferred_foods[context]["times_eaten"]))
-            is_favorite = avg_satisfaction > 12
+            is_favorite = self._food_preferences.average(context) > 12
         elif action_type == "playing" and context in self.favorite_activities:
-            avg_enjoyment = (self.favorite_activities[context]["enjoyment_total"] / 
-                           max(1, self.favorite_activities[context]["times_played"]))
-            is_favorite = avg_enjoyment > 12
+            is_favorite = self._activity_preferences.average(context) > 12
         base_responses = self._get_basic_response(action_type, context)
         if is_favorite:
-            enhanced_responses = [
-                f"Shows obvious delight - this is clearly a favorite!",
-                f"Remembers how much they love this and gets extra excited",
-                f"Reacts with learned enthusiasm from past experiences"
-            ]
-            return random.choice(enhanced_responses)
+            return self.rng.choice(FAVORITE_RESPONSES)
         elif satisfaction > 15:
             return f"{base_responses} - and seems to be learning to love it!"
         else:
@@ -741,8 +1203,6 @@ class Pet:
         else:
             return "Reacts appropriately"
     def get_personality_summary(self):
-        if not hasattr(self, 'personality_traits'):
-            return "Personality still developing..."
         summary = []
         for name, trait in self.personality_traits.items():
             level = trait.get_level()
@@ -753,23 +1213,18 @@ class Pet:
         return ", ".join(summary[:3])  
     def get_behavioral_insights(self):
         insights = []
-        if hasattr(self, 'preferred_foods') and self.preferred_foods:
-            best_food = max(self.preferred_foods.items(), 
-                          key=lambda x: x[1]["satisfaction_total"] / max(1, x[1]["times_eaten"]))
-            insights.append(f"Favorite food: {best_food[0]}")
-        if hasattr(self, 'favorite_activities') and self.favorite_activities:
-            best_activity = max(self.favorite_activities.items(),
-                              key=lambda x: x[1]["enjoyment_total"] / max(1, x[1]["times_played"]))
-            insights.append(f"Favorite activity: {best_activity[0]}")
-        if hasattr(self, 'memory') and self.memory.time_patterns:
-            most_active_hour = max(self.memory.time_patterns.items(),
-                                 key=lambda x: sum(x[1].values()))
-            insights.append(f"Most active time: {most_active_hour[0]}:00")
+        best_food = self._food_preferences.best()
+        if best_food is not None:
+            insights.append(f"Favorite food: {best_food}")
+        best_activity = self._activity_preferences.best()
+        if best_activity is not None:
+            insights.append(f"Favorite activity: {best_activity}")
+        if self.memory.most_active_hour is not None:
+            insights.append(f"Most active time: {self.memory.most_active_hour}:00")
         return insights if insights else ["Still learning and adapting..."]
+    @journaled("evolve")
     def evolve_based_on_experience(self):
-        if not hasattr(self, 'memory'):
-            return False
-        total_experiences = len(self.memory.experiences)
+        total_experiences = self.memory.experience_count
         if total_experiences > 100 and self.evolution_stage == "baby":
             self.evolution_stage = "juvenile"
             self._apply_evolution_changes("juvenile")
@@ -794,7 +1249,7 @@ class Pet:
             "adult": {"loyalty": 10, "calmness": 7},
             "elder": {"intelligence": 15, "calmness": 12}
         }
-        if new_stage in stage_bonuses and hasattr(self, 'personality_traits'):
+        if new_stage in stage_bonuses:
             for trait, bonus in stage_bonuses[new_stage].items():
                 if trait in self.personality_traits:
                     self.personality_traits[trait].modify(bonus, f"evolved to {new_stage}")
@@ -0,0 +1,98 @@
+import json
+import sqlite3
+from datetime import datetime
+from pet import Pet
+from migrations import migrate_document
+class PetStore:
+    HEADER_COLUMNS = Pet.SAVE_HEADER_FIELDS
+    def __init__(self, db_file="pets.db", synchronous="NORMAL"):
+        self.db_file = db_file
+        self.connection = sqlite3.connect(db_file)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(f"PRAGMA synchronous={synchronous}")
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS pets (
+                pet_id TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                species TEXT NOT NULL,
+                level INTEGER NOT NULL,
+                health REAL NOT NULL,
+                birth_time TEXT NOT NULL,
+                last_interaction TEXT NOT NULL,
+                updated_at TEXT NOT NULL,
+                data TEXT NOT NULL
+            )
+        """)
+        self.connection.execute("CREATE INDEX IF NOT EXISTS pets_by_name ON pets (name)")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS pets_by_update ON pets (updated_at)")
+        self.connection.commit()
+    def save_pet(self, pet):
+        self.save_pets([pet])
+    def save_pets(self, pets):
+        rows = []
+        for pet in pets:
+            data = pet.to_dict()
+            rows.append((
+                pet.pet_id, pet.name, pet.species, pet.level, pet.health,
+                data["birth_time"], data["last_interaction"], datetime.now().isoformat(),
+                json.dumps(data, separators=(",", ":"))
+            ))
+        with self.connection:
+            self.connection.executemany("""
+                INSERT INTO pets (pet_id, name, species, level, health, birth_time, last_interaction, updated_at, data)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (pet_id) DO UPDATE SET
+                    name = excluded.name,
+                    species = excluded.species,
+                    level = excluded.level,
+                    health = excluded.health,
+                    last_interaction = excluded.last_interaction,
+                    updated_at = excluded.updated_at,
+                    data = excluded.data
+            """, rows)
+    def load_pet(self, pet_id):
+        row = self.connection.execute("SELECT data FROM pets WHERE pet_id = ?", (pet_id,)).fetchone()
+        if row is None:
+            return None
+        return Pet.from_dict(migrate_document(json.loads(row[0])))
+    def delete_pet(self, pet_id):
+        with self.connection:
+            cursor = self.connection.execute("DELETE FROM pets WHERE pet_id = ?", (pet_id,))
+        return cursor.rowcount > 0
+    def count_pets(self):
+        return self.connection.execute("SELECT COUNT(*) FROM pets").fetchone()[0]
+    def list_pets(self, limit=None):
+        query = f"SELECT {', '.join(self.HEADER_COLUMNS)} FROM pets ORDER BY updated_at DESC"
+        params = ()
+        if limit is not None:
+            query += " LIMIT ?"
+            params = (limit,)
+        return [self._header_from_row(row) for row in self.connection.execute(query, params)]
+    def get_header(self, pet_id):
+        row = self.connection.execute(
+            f"SELECT {', '.join(self.HEADER_COLUMNS)} FROM pets WHERE pet_id = ?", (pet_id,)
+        ).fetchone()
+        return self._header_from_row(row) if row else None
+    def most_recent_pet_id(self):
+        row = self.connection.execute("SELECT pet_id FROM pets ORDER BY updated_at DESC LIMIT 1").fetchone()
+        return row[0] if row else None
+    def find_pet_id(self, name_or_id):
+        queries = [
+            ("SELECT pet_id FROM pets WHERE pet_id = ?", name_or_id),
+            ("SELECT pet_id FROM pets WHERE lower(name) = lower(?) ORDER BY updated_at DESC LIMIT 1", name_or_id)
+        ]
+        if len(name_or_id) >= 4:
+            queries.append(("SELECT pet_id FROM pets WHERE pet_id LIKE ? ORDER BY updated_at DESC LIMIT 1", f"{name_or_id}%"))
+        for query, param in queries:
+            row = self.connection.execute(query, (param,)).fetchone()
+            if row:
+                return row[0]
+        return None
+    def sync(self):
+        self.connection.execute("PRAGMA wal_checkpoint(FULL)")
+    def close(self):
+        self.connection.close()
+    def _header_from_row(self, row):
+        header = dict(zip(self.HEADER_COLUMNS, row))
+        header["age_days"] = (datetime.now() - datetime.fromisoformat(header["birth_time"])).days
+        return header
@@ -0,0 +1,209 @@
+import zlib
+from datetime import datetime, timedelta
+from actions import ACTION_REGISTRY, feeding_happiness, play_effect
+from pet import Pet, EnvironmentSensor, MOOD_TABLE
+try:
+    import numpy
+except ImportError:
+    numpy = None
+TRAITS = ("curiosity", "loyalty", "mischief", "independence", "sociability", "intelligence", "playfulness", "calmness")
+STATS = ("hunger", "happiness", "energy", "health")
+MOOD_NAMES = tuple(mood for _, moods in MOOD_TABLE for mood in moods)
+REFERENCE_TIME = datetime(2000, 1, 1)
+def _hours(moment):
+    return (moment - REFERENCE_TIME).total_seconds() / 3600
+def _moment(hours):
+    return REFERENCE_TIME + timedelta(hours=float(hours))
+class TraitColumn:
+    __slots__ = ("strength",)
+    def __init__(self, strength):
+        self.strength = strength
+class Population:
+    def __init__(self, pets):
+        if numpy is None:
+            raise ImportError("Population requires numpy")
+        self.pets = list(pets)
+        self.trait_index = {name: column for column, name in enumerate(TRAITS)}
+        for stat in STATS:
+            setattr(self, stat, numpy.array([getattr(pet, stat) for pet in self.pets], dtype=numpy.float64))
+        self.traits = numpy.array(
+            [[pet.personality_traits[name].strength if name in pet.personality_traits else 50 for name in TRAITS]
+             for pet in self.pets],
+            dtype=numpy.float64
+        ).reshape(len(self.pets), len(TRAITS))
+        self.environmental_sensitivity = numpy.array([pet.environmental_sensitivity for pet in self.pets], dtype=numpy.float64)
+        self.experience = numpy.array([pet.experience for pet in self.pets], dtype=numpy.float64)
+        self.interactions_today = numpy.array([pet.interactions_today for pet in self.pets], dtype=numpy.int64)
+        self.total_interactions = numpy.array([pet.total_interactions for pet in self.pets], dtype=numpy.int64)
+        self.last_interaction = numpy.array([_hours(pet.last_interaction) for pet in self.pets], dtype=numpy.float64)
+        self.last_passive_update = numpy.array([_hours(pet.last_passive_update) for pet in self.pets], dtype=numpy.float64)
+        self.last_fed = numpy.array(
+            [_hours(pet.last_fed) if pet.last_fed else numpy.nan for pet in self.pets], dtype=numpy.float64
+        )
+        self.last_played = numpy.array(
+            [_hours(pet.last_played) if pet.last_played else numpy.nan for pet in self.pets], dtype=numpy.float64
+        )
+        self.entropy_seeds = numpy.array([pet.current_entropy_seed for pet in self.pets], dtype=numpy.uint64)
+        self.name_hashes = numpy.array([zlib.crc32(pet.name.encode()) for pet in self.pets], dtype=numpy.uint64)
+        self.mood_codes = None
+        self.hour_energy = numpy.array(
+            [EnvironmentSensor._time_of_day_modifier(hour)["energy"] for hour in range(24)], dtype=numpy.float64
+        )
+        self.month_health = numpy.array(
+            [EnvironmentSensor._seasonal_modifier(EnvironmentSensor._get_season(month)).get("health", 1.0)
+             for month in range(1, 13)],
+            dtype=numpy.float64
+        )
+    def __len__(self):
+        return len(self.pets)
+    def trait(self, name):
+        return self.traits[:, self.trait_index[name]]
+    def trait_columns(self):
+        return {name: TraitColumn(self.trait(name)) for name in TRAITS}
+    @staticmethod
+    def mix(values):
+        values = values + numpy.uint64(0x9E3779B97F4A7C15)
+        values = (values ^ (values >> numpy.uint64(30))) * numpy.uint64(0xBF58476D1CE4E5B9)
+        values = (values ^ (values >> numpy.uint64(27))) * numpy.uint64(0x94D049BB133111EB)
+        return values ^ (values >> numpy.uint64(31))
+    @staticmethod
+    def _months(hours):
+        moments = numpy.datetime64(REFERENCE_TIME, "s") + (hours * 3600).astype("timedelta64[s]")
+        return moments.astype("datetime64[M]").astype(numpy.int64) % 12
+    def passive_tick(self, now=None):
+        now_hours = _hours(now or EnvironmentSensor.now())
+        idle_start = numpy.maximum(self.last_passive_update, self.last_interaction)
+        active = now_hours > idle_start
+        start = numpy.where(active, idle_start - self.last_interaction, 0.0)
+        horizon = numpy.maximum(24.0, 34.0 / numpy.maximum(self.environmental_sensitivity, 0.01))
+        end = numpy.where(active, numpy.minimum(now_hours - self.last_interaction, horizon), start)
+        first = active & (start == 0)
+        if first.any():
+            health_modifier = self.month_health[self._months(self.last_interaction)]
+            health_change = numpy.where(first, (health_modifier - 1.0) * 2 * self.environmental_sensitivity, 0.0)
+            self.health = numpy.clip(self.health + health_change, 0, 100)
+        resistances = (self.trait("independence") / 100, self.trait("sociability") / 100, self.trait("calmness") / 100)
+        hours = start
+        while True:
+            stepping = hours < end
+            if not stepping.any():
+                break
+            step_end = numpy.where(stepping, numpy.minimum(end, hours + Pet.PASSIVE_STEP_HOURS), hours)
+            hour_of_day = numpy.floor(self.last_interaction + hours).astype(numpy.int64) % 24
+            self._passive_step(hours, step_end, self.hour_energy[hour_of_day], resistances)
+            hours = step_end
+        self.last_passive_update = numpy.where(active, now_hours, self.last_passive_update)
+        return active
+    def _passive_step(self, start, end, energy_modifier, resistances):
+        isolation_resistance, social_need, stress_resistance = resistances
+        happiness_rate = 1.5 * (1 - isolation_resistance * 0.5)
+        happiness_decrease = (
+            numpy.minimum(numpy.maximum(0, end - 2) * happiness_rate, 15)
+            - numpy.minimum(numpy.maximum(0, start - 2) * happiness_rate, 15)
+        )
+        self.happiness = numpy.maximum(0, self.happiness - happiness_decrease)
+        lonely = (start <= 4) & (end > 4) & (social_need != 0)
+        self.happiness = numpy.where(lonely, numpy.maximum(0, self.happiness - social_need * 5), self.happiness)
+        distressed = (self.hunger > 80) | (self.happiness < 20)
+        health_rate = 0.3 * (1 - stress_resistance * 0.3)
+        health_decrease = numpy.minimum(end * health_rate, 5) - numpy.minimum(start * health_rate, 5)
+        self.health = numpy.where(distressed, numpy.maximum(0, self.health - health_decrease), self.health)
+        energy_rate = 0.5 * energy_modifier * self.environmental_sensitivity
+        energy_increase = numpy.minimum(end * energy_rate, 10) - numpy.minimum(start * energy_rate, 10)
+        self.energy = numpy.where(self.energy < 80, numpy.minimum(100, self.energy + energy_increase), self.energy)
+        self.hunger = numpy.minimum(100, self.hunger + numpy.minimum(end * 2, 20) - numpy.minimum(start * 2, 20))
+    def calculate_moods(self, now=None):
+        now = now or EnvironmentSensor.now()
+        base_score = self.happiness * 0.4 + self.health * 0.3 + self.energy * 0.2 + (100 - self.hunger) * 0.1
+        personality_modifier = 1.0 + (self.trait("calmness") / 100 - 0.5) * 0.2
+        hours_since_interaction = _hours(now) - self.last_interaction
+        personality_modifier -= numpy.where(hours_since_interaction > 2, self.trait("sociability") / 100 * 0.1, 0.0)
+        environment = EnvironmentSensor.snapshot(now)
+        sensitivity = self.environmental_sensitivity
+        env_modifier = (
+            environment.time_modifier.get("happiness", 1.0) * sensitivity * 0.3
+            * environment.seasonal_modifier.get("happiness", 1.0) * sensitivity * 0.2
+        )
+        final_score = base_score * personality_modifier * numpy.clip(env_modifier, 0.5, 1.5)
+        variation = self.mix(self.entropy_seeds + numpy.uint64(int(now.timestamp() // 600))) >> numpy.uint64(11)
+        final_score += variation.astype(numpy.float64) * (10.0 / (1 << 53)) - 5
+        thresholds = numpy.array([threshold for threshold, _ in MOOD_TABLE[:-1]], dtype=numpy.float64)
+        groups = numpy.searchsorted(-thresholds, -final_score, side="left")
+        picks = self.mix(self.name_hashes + numpy.uint64(int(now.timestamp() // 300))) % numpy.uint64(4)
+        self.mood_codes = groups * 4 + picks.astype(numpy.int64)
+        return self.mood_codes
+    def moods(self):
+        if self.mood_codes is None:
+            return [pet.mood for pet in self.pets]
+        return [MOOD_NAMES[code] for code in self.mood_codes]
+    def _interact(self, mask, now_hours):
+        self.last_interaction = numpy.where(mask, now_hours, self.last_interaction)
+        self.interactions_today += mask
+        self.total_interactions += mask
+        self.experience += numpy.where(mask, 5, 0)
+    def _adapt_trait(self, name, mask, change):
+        column = self.trait_index[name]
+        self.traits[:, column] = numpy.where(mask, numpy.clip(self.traits[:, column] + change, 0, 100), self.traits[:, column])
+    def feed(self, food_type="kibble", mask=None, now=None):
+        now = now or EnvironmentSensor.now()
+        food = ACTION_REGISTRY.food(food_type)
+        success = self.hunger > 10
+        if mask is not None:
+            success &= mask
+        environment = EnvironmentSensor.snapshot(now)
+        happiness = feeding_happiness(food, food_type, self.trait_columns())
+        happiness_change = happiness * environment.time_modifier.get("happiness", 1.0)
+        self.hunger = numpy.where(success, numpy.maximum(0, self.hunger + food.hunger), self.hunger)
+        self.happiness = numpy.where(success, numpy.minimum(100, self.happiness + happiness_change), self.happiness)
+        if food.health:
+            health_change = food.health * environment.seasonal_modifier.get("health", 1.0)
+            self.health = numpy.where(success, numpy.minimum(100, self.health + health_change), self.health)
+        if food.energy:
+            energy_change = food.energy * environment.time_modifier.get("energy", 1.0)
+            self.energy = numpy.where(success, numpy.minimum(100, self.energy + energy_change), self.energy)
+        now_hours = _hours(now)
+        self.last_fed = numpy.where(success, now_hours, self.last_fed)
+        self._interact(success, now_hours)
+        if food_type != "kibble":
+            self._adapt_trait("curiosity", success & (happiness_change > 10), 0.5)
+        self._adapt_trait("loyalty", success, 0.3)
+        return success
+    def play(self, activity="fetch", mask=None, now=None):
+        now = now or EnvironmentSensor.now()
+        effect = ACTION_REGISTRY.activity(activity)
+        success = (self.energy > 10) & (self.hunger < 80)
+        if mask is not None:
+            success &= mask
+        preferred_activity = EnvironmentSensor.snapshot(now).time_modifier.get("activity_preference", "fetch")
+        happiness, experience = play_effect(effect, activity, self.trait_columns(), preferred_activity)
+        self.happiness = numpy.where(success, numpy.minimum(100, self.happiness + happiness), self.happiness)
+        self.energy = numpy.where(success, numpy.maximum(0, self.energy + effect.energy), self.energy)
+        self.experience += numpy.where(success, experience, 0.0)
+        now_hours = _hours(now)
+        self.last_played = numpy.where(success, now_hours, self.last_played)
+        self._interact(success, now_hours)
+        registered = ACTION_REGISTRY.activities.get(activity)
+        if registered is not None and registered.trait in self.trait_index:
+            self._adapt_trait(registered.trait, success & (happiness > 5), registered.trait_change)
+        return success
+    def write_back(self):
+        for row, pet in enumerate(self.pets):
+            for stat in STATS:
+                setattr(pet, stat, float(getattr(self, stat)[row]))
+            for column, name in enumerate(TRAITS):
+                trait = pet.personality_traits.get(name)
+                if trait is not None and trait.strength != self.traits[row, column]:
+                    trait.modify(float(self.traits[row, column]) - trait.strength, "population update")
+            pet.experience = float(self.experience[row])
+            pet.interactions_today = int(self.interactions_today[row])
+            pet.total_interactions = int(self.total_interactions[row])
+            pet.last_interaction = _moment(self.last_interaction[row])
+            pet.last_passive_update = _moment(self.last_passive_update[row])
+            if not numpy.isnan(self.last_fed[row]):
+                pet.last_fed = _moment(self.last_fed[row])
+            if not numpy.isnan(self.last_played[row]):
+                pet.last_played = _moment(self.last_played[row])
+            if self.mood_codes is not None:
+                pet.mood = MOOD_NAMES[self.mood_codes[row]]
+            pet._mark_dirty()
+        return self.pets
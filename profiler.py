@@ -0,0 +1,59 @@
+import json
+import math
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from game_manager import atomic_write_file
+class CommandProfiler:
+    PERCENTILES = (50, 95, 99)
+    def __init__(self, enabled=True, window=1000):
+        self.enabled = enabled
+        self.window = window
+        self.samples = {}
+        self.counts = {}
+        self.totals = {}
+        self.maxima = {}
+    def record(self, phase, seconds):
+        samples = self.samples.get(phase)
+        if samples is None:
+            samples = self.samples[phase] = deque(maxlen=self.window)
+            self.counts[phase] = 0
+            self.totals[phase] = 0.0
+            self.maxima[phase] = 0.0
+        samples.append(seconds)
+        self.counts[phase] += 1
+        self.totals[phase] += seconds
+        self.maxima[phase] = max(self.maxima[phase], seconds)
+    @contextmanager
+    def _measure(self, phase):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(phase, time.perf_counter() - started)
+    def measure(self, phase):
+        return self._measure(phase) if self.enabled else nullcontext()
+    @staticmethod
+    def percentile(ordered, percent):
+        if not ordered:
+            return 0.0
+        rank = max(1, math.ceil(percent / 100 * len(ordered)))
+        return ordered[rank - 1]
+    def summary(self):
+        report = {}
+        for phase, samples in sorted(self.samples.items()):
+            ordered = sorted(samples)
+            report[phase] = {
+                "count": self.counts[phase],
+                "total_ms": self.totals[phase] * 1000,
+                "mean_ms": self.totals[phase] / self.counts[phase] * 1000,
+                "max_ms": self.maxima[phase] * 1000,
+                **{f"p{percent}_ms": self.percentile(ordered, percent) * 1000 for percent in self.PERCENTILES}
+            }
+        return report
+    def dump(self, path):
+        try:
+            atomic_write_file(path, json.dumps({"window": self.window, "phases": self.summary()}, indent=2))
+            return True
+        except Exception:
+            return False
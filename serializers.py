@@ -0,0 +1,63 @@
+import json
+import marshal
+import struct
+import sys
+class JsonSerializer:
+    name = "json"
+    epoch_timestamps = False
+    HEADER_PREFIX = b'{"save_header": '
+    def matches(self, prefix):
+        return prefix.lstrip()[:1] == b"{"
+    def dumps(self, data, header):
+        return (
+            self.HEADER_PREFIX.decode() + json.dumps(header, separators=(",", ":")) + "," +
+            json.dumps(data, indent=2)[1:]
+        )
+    def loads(self, raw):
+        data = json.loads(raw)
+        data.pop("save_header", None)
+        return data
+    def read_header(self, f):
+        line = f.readline(65536)
+        if not (line.startswith(self.HEADER_PREFIX) and line.endswith(b",\n")):
+            return None
+        return json.loads(line[len(self.HEADER_PREFIX):-2])
+class CompactSerializer:
+    name = "compact"
+    epoch_timestamps = True
+    MAGIC = b"PETSAVE\x01"
+    MARSHAL_VERSION = 4
+    MAX_INTERNED_LENGTH = 40
+    def matches(self, prefix):
+        return prefix.startswith(self.MAGIC)
+    def dumps(self, data, header):
+        header_bytes = json.dumps(header, separators=(",", ":")).encode()
+        body = marshal.dumps(self._intern(data), self.MARSHAL_VERSION)
+        return self.MAGIC + struct.pack("<I", len(header_bytes)) + header_bytes + body
+    def loads(self, raw):
+        header_length = struct.unpack_from("<I", raw, len(self.MAGIC))[0]
+        return marshal.loads(raw[len(self.MAGIC) + 4 + header_length:])
+    def read_header(self, f):
+        prefix = f.read(len(self.MAGIC) + 4)
+        if len(prefix) < len(self.MAGIC) + 4 or not self.matches(prefix):
+            return None
+        header_length = struct.unpack_from("<I", prefix, len(self.MAGIC))[0]
+        return json.loads(f.read(header_length))
+    def _intern(self, value):
+        if isinstance(value, dict):
+            return {sys.intern(key) if isinstance(key, str) else key: self._intern(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [self._intern(item) for item in value]
+        if isinstance(value, str) and len(value) <= self.MAX_INTERNED_LENGTH:
+            return sys.intern(value)
+        return value
+SERIALIZERS = {serializer.name: serializer for serializer in (JsonSerializer(), CompactSerializer())}
+def get_serializer(name):
+    if name not in SERIALIZERS:
+        raise ValueError(f"Unknown save format: {name}")
+    return SERIALIZERS[name]
+def detect_serializer(prefix):
+    for serializer in (SERIALIZERS["compact"], SERIALIZERS["json"]):
+        if serializer.matches(prefix):
+            return serializer
+    return None
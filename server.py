@@ -0,0 +1,178 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+from batch import BatchRunner
+from cli import build_game_manager
+from game_manager import GameConfig, GameManager, save_managers
+from pet_store import PetStore
+DEFAULT_ADDRESS = "127.0.0.1:8765"
+def parse_address(address):
+    host, separator, port = address.rpartition(":")
+    if separator and port.isdigit() and os.sep not in address:
+        return host or "127.0.0.1", int(port)
+    return address
+class PetSession:
+    REPLACING_COMMANDS = {"new", "load", "switch"}
+    def __init__(self, server, session_id):
+        self.server = server
+        self.session_id = session_id
+        self.game_manager = GameManager(config=server.config, store=server.store)
+        self.runner = BatchRunner(self.game_manager)
+        self.claimed_pet_id = None
+    @property
+    def pet(self):
+        return self.game_manager.pet
+    def execute(self, line):
+        parts = line.split()
+        command, args = parts[0].lower(), parts[1:]
+        if command in self.REPLACING_COMMANDS:
+            owner = self.server.owners.get(self._target_pet_id(command, args))
+            if owner is not None and owner is not self:
+                return {"command": line, "ok": False, "error": "That pet is in use by another session"}
+            if self.pet and self.game_manager.has_unsaved_changes():
+                self.game_manager.save_game()
+        entry = self.runner.execute(line)
+        self.server.claim(self)
+        return entry
+    def _target_pet_id(self, command, args):
+        store = self.server.store
+        if command == "load":
+            if args:
+                return args[0]
+            return self.pet.pet_id if self.pet else store.most_recent_pet_id()
+        if command == "switch" and args:
+            return store.find_pet_id(" ".join(args))
+        return None
+    def close(self):
+        saved = True
+        if self.pet and self.game_manager.has_unsaved_changes():
+            saved = self.game_manager.save_game()
+        self.server.release(self)
+        return saved
+class PetServer:
+    def __init__(self, config=None, store=None):
+        self.config = config or GameConfig()
+        if store is None:
+            store = build_game_manager(self.config).store or PetStore(self.config.get_setting("server_store", "server_pets.db"))
+        self.store = store
+        self.sessions = {}
+        self.owners = {}
+        self.address = None
+        self._next_session_id = 0
+        self._server = None
+        self._tasks = []
+        self._connections = set()
+    def open_session(self):
+        self._next_session_id += 1
+        session = PetSession(self, self._next_session_id)
+        self.sessions[session.session_id] = session
+        return session
+    def close_session(self, session):
+        if self.sessions.pop(session.session_id, None) is not None:
+            return session.close()
+        return True
+    def claim(self, session):
+        pet_id = session.pet.pet_id if session.pet else None
+        if pet_id == session.claimed_pet_id:
+            return
+        self.release(session)
+        if pet_id is not None:
+            self.owners[pet_id] = session
+            session.claimed_pet_id = pet_id
+    def release(self, session):
+        if session.claimed_pet_id is not None and self.owners.get(session.claimed_pet_id) is session:
+            del self.owners[session.claimed_pet_id]
+        session.claimed_pet_id = None
+    def tick(self):
+        for session in self.sessions.values():
+            if session.pet:
+                session.pet.update_passive_stats()
+                session.pet.level_up_check()
+    def save_due(self):
+        return save_managers(session.game_manager for session in self.sessions.values())
+    def save_all(self):
+        return save_managers((session.game_manager for session in self.sessions.values()), due_only=False)
+    async def _every(self, interval, callback):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                callback()
+            except Exception as e:
+                print(f"Scheduler error in {callback.__name__}: {e}", file=sys.stderr)
+    async def start(self, address=DEFAULT_ADDRESS):
+        address = parse_address(address) if isinstance(address, str) else address
+        if isinstance(address, tuple):
+            self._server = await asyncio.start_server(self._handle, *address)
+        else:
+            self._server = await asyncio.start_unix_server(self._handle, path=address)
+        self.address = self._server.sockets[0].getsockname()
+        self._tasks = [
+            asyncio.create_task(self._every(self.config.get_setting("server_tick_seconds", 60), self.tick)),
+            asyncio.create_task(self._every(self.config.get_setting("server_save_interval_seconds", 30), self.save_due))
+        ]
+        return self.address
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self.save_all()
+        for session in list(self.sessions.values()):
+            self.close_session(session)
+        for writer in list(self._connections):
+            writer.close()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            if isinstance(self.address, str) and os.path.exists(self.address):
+                os.remove(self.address)
+            self._server = None
+    async def serve_forever(self, address=DEFAULT_ADDRESS):
+        await self.start(address)
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.stop()
+    async def _respond(self, writer, entry):
+        writer.write((json.dumps(entry, default=str) + "\n").encode())
+        await writer.drain()
+    async def _handle(self, reader, writer):
+        session = self.open_session()
+        self._connections.add(writer)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                text = line.decode("utf-8", "replace").strip()
+                if not text:
+                    continue
+                if text.lower() in ("quit", "exit"):
+                    await self._respond(writer, {"command": text, "ok": True, "result": {"saved": self.close_session(session)}})
+                    break
+                await self._respond(writer, session.execute(text))
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            self.close_session(session)
+            self._connections.discard(writer)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Terminal Pets server")
+    parser.add_argument("address", nargs="?", default=DEFAULT_ADDRESS,
+                        help="host:port to listen on, or a path for a Unix domain socket")
+    args = parser.parse_args(argv)
+    server = PetServer()
+    try:
+        asyncio.run(server.serve_forever(args.address))
+    except KeyboardInterrupt:
+        pass
+    return 0
+if __name__ == "__main__":
+    sys.exit(main())
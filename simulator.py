@@ -0,0 +1,267 @@
+import argparse
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from actions import ACTION_REGISTRY
+from pet import Pet, PetRandom, EnvironmentSensor
+FOODS = tuple(ACTION_REGISTRY.foods)
+ACTIVITIES = tuple(ACTION_REGISTRY.activities)
+ACTIONS = ("feed", "play", "rest")
+DEFAULT_START = datetime(2025, 1, 1, 8)
+def derive_seed(seed, index):
+    return PetRandom.mix((seed << 32) ^ index) & 0xFFFFFFFF
+class VirtualClock:
+    __slots__ = ("current",)
+    def __init__(self, start=None):
+        self.current = start or DEFAULT_START
+    def __call__(self):
+        return self.current
+    def advance(self, delta):
+        self.current += delta
+        return self.current
+def clock_start(pets=None, start=None):
+    if start is not None:
+        return start
+    if pets:
+        return max(max(pet.last_interaction, pet.last_passive_update) for pet in pets)
+    return DEFAULT_START
+class RandomPolicy:
+    def __init__(self, weights=None, foods=FOODS, activities=ACTIVITIES):
+        weights = weights or {action: 1 for action in ACTIONS}
+        self.actions = list(weights)
+        self.cum_weights = list(itertools.accumulate(weights.values()))
+        self.foods = tuple(foods)
+        self.activities = tuple(activities)
+    def choose(self, pet, rng, step):
+        action = rng.choices(self.actions, cum_weights=self.cum_weights)[0]
+        if action == "feed":
+            return action, rng.choice(self.foods)
+        if action == "play":
+            return action, rng.choice(self.activities)
+        return action, None
+class ScriptedPolicy:
+    def __init__(self, script):
+        self.script = [self.parse_step(step) for step in script]
+        if not self.script:
+            raise ValueError("Scripted policy needs at least one action")
+    @staticmethod
+    def parse_step(step):
+        if isinstance(step, str):
+            parts = step.split()
+            step = (parts[0], parts[1] if len(parts) > 1 else None)
+        action, argument = step
+        if action not in ACTIONS:
+            raise ValueError(f"Unknown action: {action}")
+        return action, argument
+    def choose(self, pet, rng, step):
+        return self.script[step % len(self.script)]
+class SimulationStats:
+    def __init__(self):
+        self.pets = 0
+        self.days = 0
+        self.elapsed_seconds = 0.0
+        self.actions = Counter()
+        self.successes = Counter()
+        self.evolution_stages = Counter()
+        self.levels = Counter()
+        self.stat_totals = Counter()
+        self.trait_drift_totals = Counter()
+        self.trait_drift_min = {}
+        self.trait_drift_max = {}
+    def add_pet(self, pet, initial_traits):
+        self.pets += 1
+        self.evolution_stages[pet.evolution_stage] += 1
+        self.levels[pet.level] += 1
+        for stat in ("hunger", "happiness", "energy", "health"):
+            self.stat_totals[stat] += getattr(pet, stat)
+        for name, trait in pet.personality_traits.items():
+            drift = trait.strength - initial_traits.get(name, trait.strength)
+            self.trait_drift_totals[name] += drift
+            self.trait_drift_min[name] = min(self.trait_drift_min.get(name, drift), drift)
+            self.trait_drift_max[name] = max(self.trait_drift_max.get(name, drift), drift)
+    def merge(self, other):
+        self.pets += other.pets
+        self.days = max(self.days, other.days)
+        self.elapsed_seconds = max(self.elapsed_seconds, other.elapsed_seconds)
+        for name in ("actions", "successes", "evolution_stages", "levels", "stat_totals", "trait_drift_totals"):
+            getattr(self, name).update(getattr(other, name))
+        for name, drift in other.trait_drift_min.items():
+            self.trait_drift_min[name] = min(self.trait_drift_min.get(name, drift), drift)
+        for name, drift in other.trait_drift_max.items():
+            self.trait_drift_max[name] = max(self.trait_drift_max.get(name, drift), drift)
+        return self
+    def to_dict(self):
+        pets = self.pets or 1
+        total_actions = sum(self.actions.values())
+        return {
+            "pets": self.pets,
+            "days": self.days,
+            "actions": total_actions,
+            "successful_actions": sum(self.successes.values()),
+            "actions_by_type": dict(self.actions),
+            "success_rate_by_type": {
+                action: self.successes[action] / count for action, count in self.actions.items()
+            },
+            "evolution_stages": dict(self.evolution_stages),
+            "level_distribution": {level: self.levels[level] for level in sorted(self.levels)},
+            "average_stats": {stat: total / pets for stat, total in self.stat_totals.items()},
+            "trait_drift": {
+                name: {
+                    "mean": total / pets,
+                    "min": self.trait_drift_min[name],
+                    "max": self.trait_drift_max[name]
+                } for name, total in sorted(self.trait_drift_totals.items())
+            },
+            "elapsed_seconds": self.elapsed_seconds,
+            "actions_per_second": total_actions / self.elapsed_seconds if self.elapsed_seconds else 0.0
+        }
+class Simulator:
+    def __init__(self, count=0, policy=None, seed=0, pets=None, start=None, actions_per_day=12,
+                 species="Generic", memory_capacity=100, columnar_memory=False, first_index=0):
+        pets = list(pets) if pets is not None else None
+        self.clock = VirtualClock(clock_start(pets, start))
+        self.policy = policy or RandomPolicy()
+        self.seed = seed
+        self.actions_per_day = actions_per_day
+        self.step = 0
+        previous_clock = EnvironmentSensor._clock
+        EnvironmentSensor.set_clock(self.clock)
+        try:
+            self.pets = pets if pets is not None else [
+                Pet(f"sim{first_index + index}", species, memory_capacity=memory_capacity,
+                    columnar_memory=columnar_memory, seed=derive_seed(seed, first_index + index))
+                for index in range(count)
+            ]
+        finally:
+            EnvironmentSensor.set_clock(previous_clock)
+        self.policy_rngs = [
+            random.Random(derive_seed(seed ^ 0x5EED, first_index + index)) for index in range(len(self.pets))
+        ]
+        self.initial_traits = [
+            {name: trait.strength for name, trait in pet.personality_traits.items()} for pet in self.pets
+        ]
+        self.stats = SimulationStats()
+    def run(self, days):
+        interval = timedelta(hours=24 / self.actions_per_day)
+        steps = int(days * self.actions_per_day)
+        choose = self.policy.choose
+        actions = self.stats.actions
+        successes = self.stats.successes
+        work = list(zip(self.pets, self.policy_rngs))
+        previous_clock = EnvironmentSensor._clock
+        EnvironmentSensor.set_clock(self.clock)
+        started = time.perf_counter()
+        try:
+            for step in range(self.step, self.step + steps):
+                self.clock.advance(interval)
+                for pet, rng in work:
+                    pet.update_passive_stats()
+                    action, argument = choose(pet, rng, step)
+                    method = getattr(pet, action)
+                    result = method(argument) if argument is not None else method()
+                    actions[action] += 1
+                    if result["success"]:
+                        successes[action] += 1
+                        pet.level_up_check()
+        finally:
+            EnvironmentSensor.set_clock(previous_clock)
+        self.step += steps
+        self.stats.days += days
+        self.stats.elapsed_seconds += time.perf_counter() - started
+        return self.results()
+    def results(self):
+        stats = SimulationStats()
+        stats.merge(self.stats)
+        for pet, initial_traits in zip(self.pets, self.initial_traits):
+            stats.add_pet(pet, initial_traits)
+        return stats
+def _simulate_shard(task):
+    count, first_index, seed, days, policy, options, pets, step, policy_states = task
+    simulator = Simulator(count, policy, seed=seed, pets=pets, first_index=first_index, **options)
+    simulator.step = step
+    if policy_states is not None:
+        for rng, state in zip(simulator.policy_rngs, policy_states):
+            rng.setstate(state)
+    simulator.run(days)
+    return simulator.stats, simulator.pets, [rng.getstate() for rng in simulator.policy_rngs], simulator.initial_traits
+class ParallelSimulator:
+    def __init__(self, count=0, policy=None, seed=0, pets=None, workers=None, shard_size=250, start=None, **options):
+        self.pets = list(pets) if pets is not None else None
+        self.count = len(self.pets) if self.pets is not None else count
+        self.policy = policy or RandomPolicy()
+        self.seed = seed
+        self.workers = workers or os.cpu_count()
+        self.shard_size = max(1, shard_size)
+        self.start = clock_start(self.pets, start)
+        self.options = options
+        self.step = 0
+        self.policy_states = None
+        self.initial_traits = None
+        self.stats = SimulationStats()
+    def _tasks(self, days):
+        options = {**self.options, "start": self.start}
+        for first_index in range(0, self.count, self.shard_size):
+            shard = slice(first_index, first_index + min(self.shard_size, self.count - first_index))
+            pets = self.pets[shard] if self.pets is not None else None
+            policy_states = self.policy_states[shard] if self.policy_states is not None else None
+            yield (shard.stop - shard.start, first_index, self.seed, days, self.policy, options, pets,
+                   self.step, policy_states)
+    def run(self, days):
+        run_stats = SimulationStats()
+        pets = []
+        policy_states = []
+        initial_traits = []
+        started = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            for stats, shard_pets, shard_states, shard_traits in executor.map(_simulate_shard, self._tasks(days)):
+                run_stats.merge(stats)
+                pets.extend(shard_pets)
+                policy_states.extend(shard_states)
+                initial_traits.extend(shard_traits)
+        for name in ("actions", "successes"):
+            getattr(self.stats, name).update(getattr(run_stats, name))
+        self.stats.days += days
+        self.stats.elapsed_seconds += time.perf_counter() - started
+        self.pets = pets
+        self.policy_states = policy_states
+        if self.initial_traits is None:
+            self.initial_traits = initial_traits
+        actions_per_day = self.options.get("actions_per_day", 12)
+        steps = int(days * actions_per_day)
+        self.step += steps
+        self.start += timedelta(hours=24 / actions_per_day) * steps
+        return self.results()
+    def results(self):
+        stats = SimulationStats()
+        stats.merge(self.stats)
+        for pet, initial_traits in zip(self.pets or (), self.initial_traits or ()):
+            stats.add_pet(pet, initial_traits)
+        return stats
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a headless pet simulation")
+    parser.add_argument("--pets", type=int, default=100)
+    parser.add_argument("--days", type=float, default=30)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--actions-per-day", type=int, default=12)
+    parser.add_argument("--memory-capacity", type=int, default=100)
+    parser.add_argument("--script", help="comma separated actions, e.g. 'feed fish,play fetch,rest'")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes, 0 for one per CPU core")
+    parser.add_argument("--shard-size", type=int, default=250)
+    args = parser.parse_args(argv)
+    policy = ScriptedPolicy(args.script.split(",")) if args.script else RandomPolicy()
+    options = {"actions_per_day": args.actions_per_day, "memory_capacity": args.memory_capacity}
+    if args.workers == 1:
+        simulator = Simulator(args.pets, policy, seed=args.seed, **options)
+    else:
+        simulator = ParallelSimulator(args.pets, policy, seed=args.seed, workers=args.workers,
+                                      shard_size=args.shard_size, **options)
+    json.dump(simulator.run(args.days).to_dict(), sys.stdout, indent=2)
+    print()
+if __name__ == "__main__":
+    main()
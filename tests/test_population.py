@@ -0,0 +1,28 @@
+import os
+import sys
+import unittest
+from datetime import timedelta
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pet import Pet
+from population import Population, numpy
+@unittest.skipIf(numpy is None, "Population requires numpy")
+class PopulationWriteBackTest(unittest.TestCase):
+    def test_write_back_keeps_mood_without_mood_calculation(self):
+        pets = [Pet(f"pet{index}", seed=index) for index in range(3)]
+        for pet in pets:
+            pet.mood = "sad"
+        population = Population(pets)
+        population.passive_tick(max(pet.last_interaction for pet in pets) + timedelta(hours=6))
+        self.assertEqual(population.moods(), ["sad"] * 3)
+        population.write_back()
+        self.assertEqual([pet.mood for pet in pets], ["sad"] * 3)
+        self.assertTrue(all(pet.hunger > 50 for pet in pets))
+    def test_write_back_applies_calculated_moods(self):
+        pets = [Pet(f"pet{index}", seed=index) for index in range(3)]
+        population = Population(pets)
+        population.calculate_moods()
+        moods = population.moods()
+        population.write_back()
+        self.assertEqual([pet.mood for pet in pets], moods)
+if __name__ == "__main__":
+    unittest.main()
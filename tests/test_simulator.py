@@ -0,0 +1,74 @@
+import copy
+import os
+import sys
+import unittest
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pet import Pet
+from simulator import ParallelSimulator, RandomPolicy, ScriptedPolicy, Simulator
+class SimulatorExistingPetsTest(unittest.TestCase):
+    def test_passive_decay_applies_to_existing_pets(self):
+        pet = Pet("Rex", "Dog", seed=7)
+        pet.hunger = 60
+        last_update = pet.last_passive_update
+        simulator = Simulator(policy=ScriptedPolicy(["rest"]), pets=[pet], actions_per_day=24)
+        self.assertEqual(simulator.clock.current, max(pet.last_interaction, last_update))
+        simulator.run(1)
+        self.assertGreater(pet.last_passive_update, last_update)
+        self.assertGreater(pet.hunger, 70)
+    def test_parallel_run_matches_serial_run_for_existing_pets(self):
+        def make_pets():
+            pets = []
+            for index in range(6):
+                pet = Pet(f"pet{index}", seed=index)
+                for _ in range(60):
+                    pet.hunger = 50
+                    pet.energy = 80
+                    pet.feed("fish")
+                    pet.play("puzzle")
+                pets.append(pet)
+            return pets
+        serial_pets = make_pets()
+        parallel_pets = copy.deepcopy(serial_pets)
+        serial = Simulator(policy=RandomPolicy(), seed=11, pets=serial_pets)
+        parallel = ParallelSimulator(policy=RandomPolicy(), seed=11, pets=parallel_pets, workers=2, shard_size=4)
+        self.assertEqual(parallel.start, serial.clock.current)
+        serial_stats = serial.run(2).to_dict()
+        parallel_stats = parallel.run(2).to_dict()
+        for stats in (serial_stats, parallel_stats):
+            stats.pop("elapsed_seconds")
+            stats.pop("actions_per_second")
+        self.assertEqual(parallel_stats, serial_stats)
+        self.assertEqual(parallel.start, serial.clock.current)
+        for serial_pet, parallel_pet in zip(serial.pets, parallel.pets):
+            self.assertEqual(parallel_pet.memory.experience_count, serial_pet.memory.experience_count)
+            self.assertEqual(
+                {name: len(trait.development_history) for name, trait in parallel_pet.personality_traits.items()},
+                {name: len(trait.development_history) for name, trait in serial_pet.personality_traits.items()}
+            )
+            self.assertEqual(parallel_pet.last_passive_update, serial_pet.last_passive_update)
+            self.assertEqual(parallel_pet.to_dict(), serial_pet.to_dict())
+    def assertRunsMatch(self, serial, parallel, runs):
+        for days in runs:
+            serial_stats = serial.run(days).to_dict()
+            parallel_stats = parallel.run(days).to_dict()
+            for stats in (serial_stats, parallel_stats):
+                stats.pop("elapsed_seconds")
+                stats.pop("actions_per_second")
+            self.assertEqual(parallel_stats, serial_stats)
+            self.assertEqual(parallel.start, serial.clock.current)
+            self.assertEqual(parallel.step, serial.step)
+            for serial_pet, parallel_pet in zip(serial.pets, parallel.pets):
+                self.assertEqual({**parallel_pet.to_dict(), "pet_id": None}, {**serial_pet.to_dict(), "pet_id": None})
+    def test_repeated_parallel_runs_continue_fresh_population(self):
+        serial = Simulator(8, RandomPolicy(), seed=5)
+        parallel = ParallelSimulator(8, RandomPolicy(), seed=5, workers=2, shard_size=3)
+        self.assertRunsMatch(serial, parallel, (2, 2))
+        self.assertEqual(parallel.results().to_dict()["actions"], 8 * 12 * 4)
+    def test_repeated_parallel_runs_continue_script_and_existing_pets(self):
+        pets = [Pet(f"pet{index}", seed=index) for index in range(5)]
+        policy = ScriptedPolicy(["feed fish", "play puzzle", "rest", "play fetch", "feed meat"])
+        serial = Simulator(policy=policy, seed=3, pets=copy.deepcopy(pets), actions_per_day=7)
+        parallel = ParallelSimulator(policy=policy, seed=3, pets=pets, workers=2, shard_size=2, actions_per_day=7)
+        self.assertRunsMatch(serial, parallel, (1, 1.5))
+if __name__ == "__main__":
+    unittest.main()